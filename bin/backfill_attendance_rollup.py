@@ -0,0 +1,21 @@
+"""Rebuild attendance_daily_rollup from the raw attendance history.
+
+Safe to re-run: the rollup is cleared and recomputed in one transaction.
+
+    python -m bin.backfill_attendance_rollup
+"""
+
+import asyncio
+
+import checkin.database.db_handlers.member_db_handler as member_db_handler
+from checkin.root.database import engine
+
+
+async def run():
+    rows = await member_db_handler.rebuild_attendance_rollup()
+    await engine.dispose()
+    print(f"attendance_daily_rollup rebuilt with {rows} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
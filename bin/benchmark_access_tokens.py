@@ -0,0 +1,48 @@
+"""Access token format microbenchmark.
+
+Compares issuing and verifying the signed JWT access token against the compact
+single-HMAC format, and prints the size of each token. Revocation and the
+verified-token cache are left out, only the token format itself is timed:
+
+    python -m bin.benchmark_access_tokens --number 20000
+"""
+
+import argparse
+import timeit
+from uuid import uuid4
+
+import checkin.services.service_utils.auth_utils as auth_utils
+
+
+def run(number: int):
+    claims = {"admin_uid": str(uuid4()), "email": "admin@example.com"}
+    formats = {
+        "jwt": (
+            lambda: auth_utils.create_jwt_access_token(data=dict(claims)),
+            auth_utils.decode_access_token,
+        ),
+        "compact": (
+            lambda: auth_utils.create_compact_access_token(
+                admin_uid=claims["admin_uid"]
+            ),
+            auth_utils.decode_access_token,
+        ),
+    }
+
+    for name, (issue, decode) in formats.items():
+        token = issue()
+        issue_us = timeit.timeit(issue, number=number) / number * 1e6
+        verify_us = timeit.timeit(lambda: decode(token=token), number=number)
+        verify_us = verify_us / number * 1e6
+        print(
+            f"{name:>8}: issue={issue_us:.2f}us verify={verify_us:.2f}us "
+            f"size={len(token)}B"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    run(number=args.number)
@@ -0,0 +1,78 @@
+"""Check-in latency benchmark.
+
+Runs member check-ins against the database configured in .env and reports
+p50/p99 latency. Check out the commit to compare and run it again for a
+before/after reading:
+
+    python -m bin.benchmark_checkin --installation AKURE --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import checkin.services.member_service as member_service
+from checkin.root.database import engine
+from checkin.schemas.commons_schemas import Installation
+from checkin.schemas.member_schemas import Member
+
+
+async def _timed(coroutine, latencies: list[float]):
+    start = time.perf_counter()
+    await coroutine
+    latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(installation: Installation, requests: int, concurrency: int, mode: str):
+    members = (
+        await member_service.get_members(
+            installation=installation.value, limit=concurrency
+        )
+    ).result_set
+    if not members:
+        raise SystemExit(f"no members to check in for {installation.value}")
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def checkin(index: int):
+        member = members[index % len(members)]
+        async with semaphore:
+            if mode == "token":
+                coroutine = member_service.member_checkin_via_checkin_token(
+                    checkin_token=member.checkin_token, installation=installation
+                )
+            else:
+                coroutine = member_service.member_checkin(
+                    member=Member(
+                        first_name=member.first_name, last_name=member.last_name
+                    ),
+                    installation=installation,
+                )
+            await _timed(coroutine=coroutine, latencies=latencies)
+
+    await asyncio.gather(*(checkin(index) for index in range(requests)))
+    await engine.dispose()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"mode={mode} requests={requests} concurrency={concurrency}")
+    print(f"p50={percentiles[49]:.2f}ms p99={percentiles[98]:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--installation", type=Installation, default=Installation.akure)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mode", choices=["name", "token"], default="token")
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(
+            installation=args.installation,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            mode=args.mode,
+        )
+    )
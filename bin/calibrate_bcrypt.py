@@ -0,0 +1,64 @@
+"""bcrypt cost calibration.
+
+Times bcrypt hashing on this host for each cost factor and prints the highest
+one whose median hash time fits the budget. Run it on the deployment box and
+set the result as BCRYPT_ROUNDS; logins then rehash stored passwords to it:
+
+    python -m bin.calibrate_bcrypt --budget-ms 250
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+# passlib accepts 4..31; anything past 16 takes seconds per hash on current CPUs
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """Median milliseconds to hash one password at the given cost."""
+    timings = []
+    hasher = bcrypt.using(rounds=rounds)
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(budget_ms: float, samples: int) -> int:
+    # the first hash loads the backend, keep it out of the timings
+    bcrypt.using(rounds=MIN_ROUNDS).hash("calibration-password")
+
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        median_ms = time_rounds(rounds=rounds, samples=samples)
+        print(f"rounds={rounds:>2} median={median_ms:.1f}ms")
+        if median_ms > budget_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="defaults to PASSWORD_HASH_BUDGET_MS from the settings",
+    )
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    budget_ms = args.budget_ms
+    if budget_ms is None:
+        from checkin.root.settings import Settings
+
+        budget_ms = Settings().password_hash_budget_ms
+
+    rounds = calibrate(budget_ms=budget_ms, samples=args.samples)
+    print(f"BCRYPT_ROUNDS={rounds}")
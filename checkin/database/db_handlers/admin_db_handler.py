@@ -1,5 +1,6 @@
 from checkin.database.orms.admin_orm import Admin as Admin_DB
-from checkin.root.database import async_session
+from checkin.root.database import session_scope
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 from checkin.schemas.auth_schemas import (
     AdminUser,
@@ -20,26 +21,27 @@ from uuid import UUID
 LOGGER = logging.getLogger(__name__)
 
 
-async def create_admin(admin_user: AdminUser) -> AdminUserProfile:
-    async with async_session() as session:
+async def create_admin(
+    admin_user: AdminUser, session: AsyncSession = None
+) -> AdminUserProfile:
+    async with session_scope(session) as session:
         stmt = insert(Admin_DB).values(admin_user.model_dump()).returning(Admin_DB)
         try:
-            result = (await session.execute(statement=stmt)).scalar_one_or_none()
+            # savepoint, so a duplicate leaves the caller's transaction usable
+            async with session.begin_nested():
+                result = (await session.execute(statement=stmt)).scalar_one_or_none()
         except IntegrityError:
             LOGGER.error(f"duplicate record found for {admin_user.model_dump()}")
-            await session.rollback()
             raise DuplicateError
         if not result:
             LOGGER.error(f"create_admin failed for {admin_user.model_dump()}")
-            await session.rollback()
             raise CreateError
 
-        await session.commit()
         return AdminUserProfile(**result.as_dict())
 
 
-async def get_admin(email: str):
-    async with async_session() as session:
+async def get_admin(email: str, session: AsyncSession = None):
+    async with session_scope(session) as session:
         result = (
             await session.execute(select(Admin_DB).filter(Admin_DB.email == email))
         ).scalar_one_or_none()
@@ -50,8 +52,8 @@ async def get_admin(email: str):
         return AdminUserProfile(**result.as_dict())
 
 
-async def get_admin_via_phone_number(phone_number: str):
-    async with async_session() as session:
+async def get_admin_via_phone_number(phone_number: str, session: AsyncSession = None):
+    async with session_scope(session) as session:
         result = (
             await session.execute(
                 select(Admin_DB).where(Admin_DB.phone_number == phone_number)
@@ -64,8 +66,8 @@ async def get_admin_via_phone_number(phone_number: str):
         return AdminUserProfile(**result.as_dict())
 
 
-async def get_admin_profile(admin_uid: UUID):
-    async with async_session() as session:
+async def get_admin_profile(admin_uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
         result = (
             await session.execute(
                 select(Admin_DB).where(Admin_DB.admin_uid == admin_uid)
@@ -78,8 +80,10 @@ async def get_admin_profile(admin_uid: UUID):
         return AdminUserProfile(**result.as_dict())
 
 
-async def update_agent(admin_user_update: AdminUserUpdate, admin_uid: UUID):
-    async with async_session() as session:
+async def update_agent(
+    admin_user_update: AdminUserUpdate, admin_uid: UUID, session: AsyncSession = None
+):
+    async with session_scope(session) as session:
         stmt = (
             update(Admin_DB)
             .where(Admin_DB.admin_uid == admin_uid)
@@ -90,15 +94,13 @@ async def update_agent(admin_user_update: AdminUserUpdate, admin_uid: UUID):
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         if not result:
-            await session.rollback()
             raise UpdateError
 
-        await session.commit()
         return AdminUserProfile(**result.as_dict())
 
 
-async def delete_admin(admin_uid: UUID):
-    async with async_session() as session:
+async def delete_admin(admin_uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
         stmt = (
             delete(Admin_DB).where(Admin_DB.admin_uid == admin_uid).returning(Admin_DB)
         )
@@ -106,8 +108,6 @@ async def delete_admin(admin_uid: UUID):
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         if not result:
-            await session.rollback()
             raise DeleteError
 
-        await session.commit()
         return AdminUserProfile(**result.as_dict())
@@ -1,4 +1,16 @@
-from sqlalchemy import insert, select, update, delete, and_, func
+from sqlalchemy import (
+    insert,
+    select,
+    update,
+    delete,
+    and_,
+    func,
+    literal,
+    tuple_,
+    true,
+    Date,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from checkin.services.service_utils.exception_collection import (
     CreateError,
@@ -7,6 +19,7 @@ from checkin.services.service_utils.exception_collection import (
     NotFound,
     UpdateError,
 )
+import checkin.services.service_utils.pagination_utils as pagination_utils
 from checkin.schemas.member_schemas import (
     AdminMemberStatistics,
     Attendance,
@@ -15,17 +28,23 @@ from checkin.schemas.member_schemas import (
     MemberExtendedProfile,
     NewMember,
     MemberProfile,
+    MemberSearchResult,
     Installation,
     MemberUpdate,
     PaginatedMemberAttendanceProfile,
     PaginatedMemberProfile,
 )
-from uuid import UUID
-from checkin.root.database import async_session
+from uuid import UUID, uuid4
+from typing import Optional
+from checkin.root.database import session_scope
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 from checkin.database.orms.member_orm import Members as MemberDB
 from checkin.database.orms.member_orm import Attendance as AttendanceDB
-from datetime import date
+from checkin.database.orms.member_orm import AttendanceDailyRollup as RollupDB
+from checkin.database.orms.member_orm import member_full_name, attendance_guest_key
+from datetime import date, datetime
+from itsdangerous import BadSignature
 from itsdangerous.url_safe import URLSafeSerializer
 
 LOGGER = logging.getLogger(__file__)
@@ -38,39 +57,50 @@ def checkin_token_gen(member_uid: str):
     return s.dumps(member_uid)
 
 
-async def create_new_member(new_member: NewMember, installation: Installation):
-    async with async_session() as session:
+def resolve_checkin_token(checkin_token: str) -> Optional[UUID]:
+    """member_uid signed into a checkin token, or None when it can't be verified."""
+    try:
+        return UUID(s.loads(checkin_token))
+    except (BadSignature, TypeError, ValueError):
+        return None
+
+
+async def create_new_member(
+    new_member: NewMember, installation: Installation, session: AsyncSession = None
+):
+    # the token signs the member_uid, so mint both and write them in one INSERT
+    member_uid = uuid4()
+    async with session_scope(session) as session:
         stmt = (
             insert(MemberDB)
             .values(
                 **new_member.model_dump(),
+                member_uid=member_uid,
+                checkin_token=checkin_token_gen(member_uid=str(member_uid)),
                 installation=installation.value,
                 is_first_time=True,
             )
             .returning(MemberDB)
         )
         try:
-            result = (await session.execute(statement=stmt)).scalar_one_or_none()
+            # savepoint, so a duplicate leaves the caller's transaction usable
+            async with session.begin_nested():
+                result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         except IntegrityError:
             LOGGER.exception(IntegrityError)
             LOGGER.error(f"duplicate record found for {new_member.model_dump()}")
-            await session.rollback()
             raise DuplicateError
 
         if not result:
             LOGGER.error(f"create new member failed, for {new_member.model_dump()}")
-            session.rollback()
             raise CreateError
 
-        result.checkin_token = checkin_token_gen(member_uid=str(result.member_uid))
-
-        await session.commit()
         return MemberExtendedProfile(**result.as_dict(), attendance=[])
 
 
-async def get_member(member_uid: UUID):
-    async with async_session() as session:
+async def get_member(member_uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
         stmt = select(MemberDB).where(MemberDB.member_uid == member_uid)
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
@@ -82,7 +112,7 @@ async def get_member(member_uid: UUID):
 
         # attendance
         member_attendance = await get_member_attendance_records(
-            member_uid=result.member_uid
+            member_uid=result.member_uid, session=session
         )
 
         return MemberExtendedProfile(
@@ -90,8 +120,10 @@ async def get_member(member_uid: UUID):
         )
 
 
-async def get_member_via_names(first_name: UUID, last_name: UUID, **kwargs):
-    async with async_session() as session:
+async def get_member_via_names(
+    first_name: UUID, last_name: UUID, session: AsyncSession = None, **kwargs
+):
+    async with session_scope(session) as session:
         stmt = select(MemberDB).where(
             and_(
                 MemberDB.first_name.icontains(first_name),
@@ -107,15 +139,98 @@ async def get_member_via_names(first_name: UUID, last_name: UUID, **kwargs):
             raise NotFound
         # attendance
         member_attendance = await get_member_attendance_records(
-            member_uid=result.member_uid
+            member_uid=result.member_uid, session=session
         )
         return MemberExtendedProfile(
             **result.as_dict(), attendance=member_attendance.result_set
         )
 
 
-async def get_member_via_mail(email: str):
-    async with async_session() as session:
+async def search_members(
+    query: str,
+    installation: Installation,
+    limit: int = 10,
+    session: AsyncSession = None,
+):
+    """Top `limit` members whose full name is trigram-similar to `query`, best first."""
+    full_name = member_full_name(MemberDB.first_name, MemberDB.last_name)
+    query = query.strip().lower()
+    similarity = func.similarity(full_name, query)
+
+    filter_case = [full_name.op("%")(query), MemberDB.installation == installation]
+    if installation == Installation.global_.value:
+        filter_case = filter_case[:1]
+
+    async with session_scope(session) as session:
+        stmt = (
+            select(
+                MemberDB.member_uid,
+                MemberDB.first_name,
+                MemberDB.last_name,
+                MemberDB.is_first_time,
+                MemberDB.installation,
+            )
+            .filter(and_(*filter_case))
+            .order_by(similarity.desc(), MemberDB.member_uid)
+            .limit(limit)
+        )
+
+        result = (await session.execute(statement=stmt)).mappings().all()
+
+        return [MemberSearchResult(**x) for x in result]
+
+
+async def stream_segment_members(
+    installation: Installation,
+    first_timers_only: bool = False,
+    joined_since: Optional[date] = None,
+    batch_size: int = 500,
+):
+    """Yield batches of member mail fields, keyset-paged by member_uid.
+
+    Each batch is read in its own short transaction, and no connection is held
+    while the caller works through a batch, however long the campaign runs.
+    """
+    filter_case = []
+    if installation != Installation.global_.value:
+        filter_case.append(MemberDB.installation == installation)
+    if first_timers_only:
+        filter_case.append(MemberDB.is_first_time.is_(True))
+    if joined_since is not None:
+        filter_case.append(MemberDB.date_created_utc >= joined_since)
+
+    stmt = (
+        select(
+            MemberDB.member_uid,
+            MemberDB.first_name,
+            MemberDB.last_name,
+            MemberDB.email,
+            MemberDB.installation,
+        )
+        .filter(and_(true(), *filter_case))
+        .order_by(MemberDB.member_uid)
+        .limit(batch_size)
+    )
+
+    last_member_uid = None
+    while True:
+        page = stmt
+        if last_member_uid is not None:
+            page = stmt.filter(MemberDB.member_uid > last_member_uid)
+
+        async with session_scope() as session:
+            members = (await session.execute(statement=page)).mappings().all()
+
+        if not members:
+            return
+        last_member_uid = members[-1]["member_uid"]
+        yield [dict(member) for member in members]
+        if len(members) < batch_size:
+            return
+
+
+async def get_member_via_mail(email: str, session: AsyncSession = None):
+    async with session_scope(session) as session:
         stmt = select(MemberDB).filter(MemberDB.email == email)
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
@@ -126,16 +241,23 @@ async def get_member_via_mail(email: str):
             raise NotFound
         # attendance
         member_attendance = await get_member_attendance_records(
-            member_uid=result.member_uid
+            member_uid=result.member_uid, session=session
         )
         return MemberExtendedProfile(
             **result.as_dict(), attendance=member_attendance.result_set
         )
 
 
-async def get_member_via_checkin_token(checkin_token: str, **kwargs):
-    async with async_session() as session:
-        stmt = select(MemberDB).filter(MemberDB.checkin_token == checkin_token)
+async def get_member_via_checkin_token(
+    checkin_token: str, session: AsyncSession = None, **kwargs
+):
+    member_uid = resolve_checkin_token(checkin_token=checkin_token)
+    async with session_scope(session) as session:
+        if member_uid is not None:
+            stmt = select(MemberDB).where(MemberDB.member_uid == member_uid)
+        else:
+            # legacy tokens that don't carry a verifiable member_uid
+            stmt = select(MemberDB).filter(MemberDB.checkin_token == checkin_token)
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
@@ -145,7 +267,7 @@ async def get_member_via_checkin_token(checkin_token: str, **kwargs):
             raise NotFound
         # attendance
         member_attendance = await get_member_attendance_records(
-            member_uid=result.member_uid
+            member_uid=result.member_uid, session=session
         )
         return MemberExtendedProfile(
             **result.as_dict(), attendance=member_attendance.result_set
@@ -153,15 +275,35 @@ async def get_member_via_checkin_token(checkin_token: str, **kwargs):
 
 
 async def get_installation_members(installation: Installation, **kwargs):
+    """Page through an installation's members ordered by (date_created_utc, member_uid).
+
+    `cursor` is the decoded (date_created_utc, member_uid) keyset of the last row
+    of the previous page; when set it replaces the offset. A `limit` of None
+    returns every member.
+    """
     limit = kwargs.get("limit", 10)
     offset = kwargs.get("offset", 0)
+    cursor = kwargs.get("cursor")
 
     filter_case = [MemberDB.installation == installation]
     if installation == Installation.global_.value:
         filter_case = []
-    async with async_session() as session:
-        stmt = select(MemberDB).filter(and_(*filter_case))
-        stmt.offset(offset=offset).limit(limit=limit)
+    async with session_scope(kwargs.get("session")) as session:
+        stmt = (
+            select(MemberDB)
+            .filter(and_(*filter_case))
+            .order_by(MemberDB.date_created_utc, MemberDB.member_uid)
+        )
+        if cursor is not None:
+            stmt = stmt.filter(
+                tuple_(MemberDB.date_created_utc, MemberDB.member_uid) > tuple_(*cursor)
+            )
+        else:
+            stmt = stmt.offset(offset)
+        if limit is not None:
+            # one extra row tells us whether there is a next page
+            stmt = stmt.limit(limit + 1)
+
         result = (await session.execute(statement=stmt)).scalars().all()
         match_size = (
             await session.execute(
@@ -170,27 +312,42 @@ async def get_installation_members(installation: Installation, **kwargs):
         ).scalar()
 
         if not result:
-            return PaginatedMemberProfile()
+            return PaginatedMemberProfile(result_size=match_size)
+
+        next_cursor = None
+        if limit is not None and len(result) > limit:
+            result = result[:limit]
+            next_cursor = pagination_utils.encode_cursor(
+                date_created_utc=result[-1].date_created_utc,
+                member_uid=result[-1].member_uid,
+            )
 
-        pagninated_member_profile = PaginatedMemberProfile(result_size=match_size)
+        pagninated_member_profile = PaginatedMemberProfile(
+            result_size=match_size, next_cursor=next_cursor
+        )
+
+        # one IN (...) query for the whole page, grouped in memory
+        members_attendance = await get_members_attendance_records(
+            member_uids=[x.member_uid for x in result], session=session
+        )
 
         for x in result:
-            member_attendance = await get_member_attendance_records(
-                member_uid=x.member_uid
-            )
             pagninated_member_profile.result_set.append(
                 MemberExtendedProfile(
-                    **x.as_dict(), attendance=member_attendance.result_set
+                    **x.as_dict(),
+                    attendance=members_attendance.get(x.member_uid, []),
                 )
             )
 
         return pagninated_member_profile
 
 
-async def update_member(member_uid: UUID, member_update: MemberUpdate):
+async def update_member(
+    member_uid: UUID, member_update: MemberUpdate, session: AsyncSession = None
+):
     update_member_dict = member_update.model_dump(exclude_none=True, exclude_unset=True)
 
-    async with async_session() as session:
+    async with session_scope(session) as session:
         stmt = (
             update(MemberDB)
             .filter(MemberDB.member_uid == member_uid)
@@ -201,15 +358,21 @@ async def update_member(member_uid: UUID, member_update: MemberUpdate):
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         if not result:
-            await session.rollback()
             raise UpdateError
 
-        await session.commit()
         return MemberProfile(**result.as_dict())
 
 
-async def delete_member(member_uid: UUID):
-    async with async_session() as session:
+async def delete_member(member_uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
+        # attendance goes first, the rollup reads the member's installation
+        try:
+            await delete_member_attendance_record(
+                member_uid=member_uid, session=session
+            )
+        except DeleteError:
+            LOGGER.error(f"member: {member_uid} has no attendance to delete")
+
         stmt = (
             delete(MemberDB)
             .filter(MemberDB.member_uid == member_uid)
@@ -219,63 +382,183 @@ async def delete_member(member_uid: UUID):
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         if not result:
-            await session.rollback()
             raise DeleteError
 
-        await delete_member_attendance_record(member_uid=member_uid)
-        await session.commit()
-
         return MemberProfile(**result.as_dict())
 
 
 ######################## Attendance ########################################################
 
+ROLLUP_COUNTERS = (
+    "sunday_service",
+    "midweek_service",
+    "global_gethsemane",
+    "first_timers",
+    "guests",
+)
+
+
+async def _rollup_attendance(session: AsyncSession, attendance: dict, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one attendance from its daily rollup row.
+
+    The installation is read from the member in the same INSERT ... SELECT ...
+    ON CONFLICT DO UPDATE, so it costs one round trip. The first-timer count
+    comes from the attendance row itself, so removing an attendance undoes
+    exactly what adding it did.
+    """
+    counts = select(
+        MemberDB.installation,
+        literal(attendance["date"], Date),
+        literal(sign * int(attendance["sunday_service"])),
+        literal(sign * int(attendance["midweek_service"])),
+        literal(sign * int(attendance["global_gethsemane"])),
+        literal(sign * int(attendance["is_first_time"])),
+        literal(sign * int(attendance["is_guest"])),
+    ).where(MemberDB.member_uid == attendance["member_uid"])
+
+    stmt = pg_insert(RollupDB).from_select(
+        ["installation", "date", *ROLLUP_COUNTERS], counts
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RollupDB.installation, RollupDB.date],
+        set_={
+            **{
+                counter: getattr(RollupDB, counter) + getattr(stmt.excluded, counter)
+                for counter in ROLLUP_COUNTERS
+            },
+            "date_updated_utc": datetime.utcnow(),
+        },
+    )
+
+    await session.execute(statement=stmt)
+
+
+async def rebuild_attendance_rollup():
+    """Recompute every rollup row from the raw attendance table."""
+    async with session_scope() as session:
+        await session.execute(delete(RollupDB))
+
+        counts = (
+            select(
+                MemberDB.installation,
+                AttendanceDB.date,
+                func.count().filter(AttendanceDB.sunday_service == True),
+                func.count().filter(AttendanceDB.midweek_service == True),
+                func.count().filter(AttendanceDB.global_gethsemane == True),
+                func.count().filter(AttendanceDB.is_first_time == True),
+                func.count().filter(AttendanceDB.is_guest == True),
+            )
+            .join(MemberDB, MemberDB.member_uid == AttendanceDB.member_uid)
+            .group_by(MemberDB.installation, AttendanceDB.date)
+        )
+        result = await session.execute(
+            insert(RollupDB).from_select(
+                ["installation", "date", *ROLLUP_COUNTERS], counts
+            )
+        )
+
+        return result.rowcount
+
 
-async def create_attendance_record(attendance: Attendance):
-    async with async_session() as session:
+async def create_attendance_record(
+    attendance: Attendance, session: AsyncSession = None
+):
+    """Record the attendance, or return the one already taken for that day and place.
+
+    INSERT ... ON CONFLICT DO NOTHING RETURNING takes one round trip for a first
+    check-in and can't double-insert when two kiosks race on the same member.
+    """
+    async with session_scope(session) as session:
         stmt = (
-            insert(AttendanceDB)
-            .values(**attendance.model_dump())
+            pg_insert(AttendanceDB)
+            .values(
+                **attendance.model_dump(),
+                is_first_time=func.coalesce(
+                    select(MemberDB.is_first_time)
+                    .where(MemberDB.member_uid == attendance.member_uid)
+                    .scalar_subquery(),
+                    False,
+                ),
+            )
+            .on_conflict_do_nothing(
+                index_elements=[
+                    AttendanceDB.member_uid,
+                    AttendanceDB.date,
+                    attendance_guest_key(AttendanceDB.guest_installation),
+                ]
+            )
             .returning(AttendanceDB)
         )
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
+        if result is not None:
+            await _rollup_attendance(session=session, attendance=result.as_dict())
+        else:
+            # already checked in
+            stmt = select(AttendanceDB).filter(
+                AttendanceDB.member_uid == attendance.member_uid,
+                AttendanceDB.date == attendance.date,
+                AttendanceDB.guest_installation.is_not_distinct_from(
+                    attendance.guest_installation
+                ),
+            )
+            result = (await session.execute(statement=stmt)).scalar_one_or_none()
+
         if result is None:
-            await session.rollback()
             LOGGER.error(f"attendance was not saved {attendance.model_dump()}")
             raise CreateError
 
-        await session.commit()
-
         return AttendanceProfile(**result.as_dict())
 
 
-async def get_member_attendance_records(member_uid: UUID):
-    async with async_session() as session:
-        stmt = select(AttendanceDB).filter(AttendanceDB.member_uid == member_uid)
+async def get_member_attendance_records(member_uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
+        stmt = (
+            select(AttendanceDB)
+            .filter(AttendanceDB.member_uid == member_uid)
+            .order_by(AttendanceDB.date_created_utc)
+        )
 
         result = (await session.execute(statement=stmt)).scalars().all()
 
-        match_size = (
-            await session.execute(
-                select(func.count(AttendanceDB.member_uid)).filter(
-                    AttendanceDB.member_uid == member_uid
-                )
-            )
-        ).scalar()
-
         if not result:
             return PaginatedMemberAttendanceProfile()
 
+        # the full history is returned, so its length is the match size
         return PaginatedMemberAttendanceProfile(
             result_set=[AttendanceProfile(**x.as_dict()) for x in result],
-            result_size=match_size,
+            result_size=len(result),
         )
 
 
-async def get_todays_attendance(member_uid: UUID, date_: date):
-    async with async_session() as session:
+async def get_members_attendance_records(
+    member_uids: list[UUID], session: AsyncSession = None
+) -> dict[UUID, list[AttendanceProfile]]:
+    """Attendance for many members in a single query, keyed by member_uid."""
+    members_attendance = {member_uid: [] for member_uid in member_uids}
+    if not member_uids:
+        return members_attendance
+
+    stmt = (
+        select(AttendanceDB)
+        .filter(AttendanceDB.member_uid.in_(member_uids))
+        .order_by(AttendanceDB.date_created_utc)
+    )
+
+    async with session_scope(session) as session:
+        result = (await session.execute(statement=stmt)).scalars().all()
+
+    for x in result:
+        members_attendance[x.member_uid].append(AttendanceProfile(**x.as_dict()))
+
+    return members_attendance
+
+
+async def get_todays_attendance(
+    member_uid: UUID, date_: date, session: AsyncSession = None
+):
+    async with session_scope(session) as session:
         stmt = select(AttendanceDB).filter(
             AttendanceDB.member_uid == member_uid,
             AttendanceDB.date == date_,
@@ -292,8 +575,10 @@ async def get_todays_attendance(member_uid: UUID, date_: date):
         return [AttendanceProfile(**x.as_dict()) for x in result]
 
 
-async def get_member_attendance_record(member_uid: UUID, uid: UUID):
-    async with async_session() as session:
+async def get_member_attendance_record(
+    member_uid: UUID, uid: UUID, session: AsyncSession = None
+):
+    async with session_scope(session) as session:
         stmt = select(AttendanceDB).filter(
             AttendanceDB.member_uid == member_uid, AttendanceDB.uid == uid
         )
@@ -309,8 +594,8 @@ async def get_member_attendance_record(member_uid: UUID, uid: UUID):
         return AttendanceProfile(**result.as_dict())
 
 
-async def get_member_attendance_record_via_uid(uid: UUID):
-    async with async_session() as session:
+async def get_member_attendance_record_via_uid(uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
         stmt = select(AttendanceDB).filter(AttendanceDB.uid == uid)
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
@@ -323,9 +608,21 @@ async def get_member_attendance_record_via_uid(uid: UUID):
 
 
 async def update_member_attendance_record(
-    member_uid: UUID, uid: UUID, attendance_update: AttendanceUpdate
+    member_uid: UUID,
+    uid: UUID,
+    attendance_update: AttendanceUpdate,
+    session: AsyncSession = None,
 ):
-    async with async_session() as session:
+    async with session_scope(session) as session:
+        previous = (
+            await session.execute(
+                select(AttendanceDB)
+                .filter(AttendanceDB.member_uid == member_uid, AttendanceDB.uid == uid)
+                .with_for_update()
+            )
+        ).scalar_one_or_none()
+        previous = previous.as_dict() if previous else None
+
         stmt = (
             update(AttendanceDB)
             .filter(AttendanceDB.member_uid == member_uid, AttendanceDB.uid == uid)
@@ -338,19 +635,19 @@ async def update_member_attendance_record(
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         if not result:
-            await session.rollback()
             LOGGER.error(
                 f"attendance for member: {member_uid} and uid: {uid} failed to update"
             )
-            raise DeleteError
+            raise UpdateError
 
-        await session.commit()
+        await _rollup_attendance(session=session, attendance=previous, sign=-1)
+        await _rollup_attendance(session=session, attendance=result.as_dict())
 
         return AttendanceProfile(**result.as_dict())
 
 
-async def delete_attendance_record(uid: UUID):
-    async with async_session() as session:
+async def delete_attendance_record(uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
         stmt = (
             delete(AttendanceDB).filter(AttendanceDB.uid == uid).returning(AttendanceDB)
         )
@@ -358,17 +655,18 @@ async def delete_attendance_record(uid: UUID):
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         if not result:
-            await session.rollback()
             LOGGER.error(f"attendance for uid: {uid} failed to delete")
             raise DeleteError
 
-        await session.commit()
+        await _rollup_attendance(session=session, attendance=result.as_dict(), sign=-1)
 
         return AttendanceProfile(**result.as_dict())
 
 
-async def delete_member_attendance_record(member_uid: UUID):
-    async with async_session() as session:
+async def delete_member_attendance_record(
+    member_uid: UUID, session: AsyncSession = None
+):
+    async with session_scope(session) as session:
         stmt = (
             delete(AttendanceDB)
             .filter(AttendanceDB.member_uid == member_uid)
@@ -378,11 +676,13 @@ async def delete_member_attendance_record(member_uid: UUID):
         result = (await session.execute(statement=stmt)).scalars().all()
 
         if not result:
-            await session.rollback()
             LOGGER.error(f"attendance for member_uid: {member_uid} failed to delete")
             raise DeleteError
 
-        await session.commit()
+        for attendance in result:
+            await _rollup_attendance(
+                session=session, attendance=attendance.as_dict(), sign=-1
+            )
 
         return
 
@@ -393,55 +693,53 @@ async def delete_member_attendance_record(member_uid: UUID):
 # Total Number At Church On Sunday
 # Total Number At Church for Gethsemane
 async def member_attendance_statistics(
-    installation: Installation, member_uids: list[UUID] = None
+    installation: Installation, session: AsyncSession = None
 ):
-    filter_case = [AttendanceDB.member_uid.in_(member_uids)]
-    if member_uids is None:
-        filter_case = []
-    async with async_session() as session:
-        global_gethsemane_stmt = select(
-            (func.count(AttendanceDB.global_gethsemane))
-        ).filter(and_(*filter_case, AttendanceDB.global_gethsemane == True))
-
-        total_number_on_sunday = select(
-            (func.count(AttendanceDB.sunday_service))
-        ).filter(and_(*filter_case, AttendanceDB.sunday_service == True))
-        local_gethsemane = select((func.count(AttendanceDB.midweek_service))).filter(
-            and_(*filter_case, AttendanceDB.midweek_service == True)
+    """Dashboard counts for an installation (every installation for GLOBAL).
+
+    Runs as a single statement: two one-row aggregates, members and the daily
+    attendance rollup of those members, cross joined.
+    """
+    member_filter_case = [MemberDB.installation == installation]
+    if installation == Installation.global_:
+        member_filter_case = []
+
+    member_stats = (
+        select(
+            func.count().label("total_number_members"),
+            func.count()
+            .filter(MemberDB.is_first_time == True)
+            .label("total_number_first_timers"),
         )
-
-        installqtion_filter_case = [MemberDB.installation == installation]
-        if installation == Installation.global_:
-            filter_case = []
-        total_number_member = select((func.count(MemberDB.member_uid))).filter(
-            and_(*installqtion_filter_case)
+        .select_from(MemberDB)
+        .filter(*member_filter_case)
+        .subquery()
+    )
+
+    rollup_filter_case = [RollupDB.installation == installation]
+    if installation == Installation.global_:
+        rollup_filter_case = []
+
+    # O(days) rollup rows instead of O(check-ins) attendance rows
+    attendance_stats = (
+        select(
+            func.coalesce(func.sum(RollupDB.sunday_service), 0).label(
+                "total_number_on_sunday"
+            ),
+            func.coalesce(func.sum(RollupDB.global_gethsemane), 0).label(
+                "total_number_global_gethsemane"
+            ),
+            func.coalesce(func.sum(RollupDB.midweek_service), 0).label(
+                "total_number_local_gethsemane"
+            ),
         )
+        .filter(*rollup_filter_case)
+        .subquery()
+    )
 
-        total_number_first_time = select((func.count(MemberDB.member_uid))).filter(
-            and_(*installqtion_filter_case, MemberDB.is_first_time == True)
-        )
+    async with session_scope(session) as session:
+        stmt = select(member_stats, attendance_stats)
 
-        global_gethsemane_result = (
-            await session.execute(statement=global_gethsemane_stmt)
-        ).scalar()
-        total_number_on_sunday_result = (
-            await session.execute(statement=total_number_on_sunday)
-        ).scalar()
+        result = (await session.execute(statement=stmt)).one()
 
-        local_gethsemane_result = (
-            await session.execute(statement=local_gethsemane)
-        ).scalar()
-        total_number_member_result = (
-            await session.execute(statement=total_number_member)
-        ).scalar()
-        total_number_first_time_result = (
-            await session.execute(statement=total_number_first_time)
-        ).scalar()
-
-        return AdminMemberStatistics(
-            total_number_first_timers=total_number_first_time_result,
-            total_number_global_gethsemane=global_gethsemane_result,
-            total_number_local_gethsemane=local_gethsemane_result,
-            total_number_on_sunday=total_number_on_sunday_result,
-            total_number_members=total_number_member_result,
-        )
+        return AdminMemberStatistics(**result._asdict())
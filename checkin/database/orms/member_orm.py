@@ -1,10 +1,29 @@
 from sqlalchemy.dialects.postgresql import UUID
 from checkin.root.utils.abstract_base import AbstractBase
 
-from sqlalchemy import String, Column, Date, Boolean
+from sqlalchemy import (
+    String,
+    Column,
+    Date,
+    Boolean,
+    Index,
+    Integer,
+    func,
+    literal_column,
+)
 from uuid import uuid4
 
 
+def member_full_name(first_name, last_name):
+    # literal_column keeps the expression free of bind params, so queries match
+    # the functional trigram index exactly
+    return func.lower(
+        func.coalesce(first_name, literal_column("''"))
+        + literal_column("' '")
+        + func.coalesce(last_name, literal_column("''"))
+    )
+
+
 class Members(AbstractBase):
     __tablename__ = "members"
     member_uid = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -24,6 +43,41 @@ class Members(AbstractBase):
     checkin_token = Column(String, nullable=True)
     is_first_time = Column(Boolean, nullable=False)
 
+    __table_args__ = (
+        # keyset pagination of the member listing
+        Index(
+            "ix_members_installation_date_created_utc_member_uid",
+            "installation",
+            "date_created_utc",
+            "member_uid",
+        ),
+        # pg_trgm GIN indexes backing icontains name lookups and fuzzy search;
+        # icontains compiles to column ILIKE ..., which gin_trgm_ops serves as is
+        Index(
+            "ix_members_first_name_trgm",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_members_last_name_trgm",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_members_full_name_trgm",
+            member_full_name(first_name, last_name).label("full_name"),
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
+
+
+def attendance_guest_key(guest_installation):
+    # NULL (home) guest_installation must collide with itself in the unique index
+    return func.coalesce(guest_installation, literal_column("''"))
+
 
 class Attendance(AbstractBase):
     __tablename__ = "attendance"
@@ -35,3 +89,31 @@ class Attendance(AbstractBase):
     midweek_service = Column(Boolean, nullable=False)
     is_guest = Column(Boolean, nullable=False)
     guest_installation = Column(String, nullable=True)
+    # the member's first-timer status when this attendance was taken; the daily
+    # rollup counts first-timers from here, not from the member's current flag
+    is_first_time = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        # one attendance per member, per day, per hosting installation
+        Index(
+            "uq_attendance_member_uid_date_guest_installation",
+            "member_uid",
+            "date",
+            attendance_guest_key(guest_installation),
+            unique=True,
+        ),
+    )
+
+
+class AttendanceDailyRollup(AbstractBase):
+    """Attendance counts per member installation and day, kept in step with attendance."""
+
+    __tablename__ = "attendance_daily_rollup"
+    installation = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    sunday_service = Column(Integer, nullable=False, default=0)
+    midweek_service = Column(Integer, nullable=False, default=0)
+    global_gethsemane = Column(Integer, nullable=False, default=0)
+    first_timers = Column(Integer, nullable=False, default=0)
+    # check-ins these members made as guests of another installation
+    guests = Column(Integer, nullable=False, default=0)
@@ -1,18 +1,41 @@
-from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi import Depends, FastAPI
+from fastapi import Response
+from fastapi.responses import PlainTextResponse, RedirectResponse
 
 from checkin.routers.admin_route import api_router as admin_router
 from checkin.routers.member_route import api_router as member_router
-from checkin.schemas.commons_schemas import Installation
-from checkin.services.member_service import get_members
 from checkin.routers.attendance_route import api_router as attendance_router
+from checkin.routers.campaign_route import api_router as campaign_router
+from checkin.root.redis_manager import redis_pool
+from checkin.root.database import db_pool_statistics
+from checkin.schemas.auth_schemas import AdminUserProfile
+from checkin.services.service_utils.auth_utils import get_current_user
+import checkin.root.health as health
+import checkin.root.metrics as metrics
+import checkin.root.query_profiler as query_profiler
+import checkin.services.service_utils.revocation_filter as revocation_filter
+import checkin.services.service_utils.admin_profile_cache as admin_profile_cache
+import checkin.root.utils.mail_queue as mail_queue
+import checkin.services.campaign_service as campaign_service
 
 
 def intialize() -> FastAPI:
     app = FastAPI()
+    app.add_middleware(metrics.HTTPMetricsMiddleware)
+    if query_profiler.settings.query_profiler_enabled:
+        app.add_middleware(query_profiler.QueryProfilerMiddleware)
     app.include_router(router=admin_router)
     app.include_router(router=member_router)
     app.include_router(router=attendance_router)
+    app.include_router(router=campaign_router)
+    app.add_event_handler("startup", revocation_filter.start)
+    app.add_event_handler("startup", admin_profile_cache.start)
+    app.add_event_handler("startup", mail_queue.start)
+    app.add_event_handler("shutdown", campaign_service.stop)
+    app.add_event_handler("shutdown", mail_queue.stop)
+    app.add_event_handler("shutdown", revocation_filter.stop)
+    app.add_event_handler("shutdown", admin_profile_cache.stop)
+    app.add_event_handler("shutdown", redis_pool.disconnect)
 
     return app
 
@@ -25,7 +48,34 @@ def root():
     return RedirectResponse(url="/docs")
 
 
+@app.get("/livez", status_code=200)
+async def livez():
+    return {"alive": True}
+
+
+@app.get("/readyz", status_code=200)
+async def readyz(response: Response):
+    result = await health.readiness()
+    if not result["ready"]:
+        response.status_code = 503
+    return result
+
+
+@app.get("/metrics", status_code=200)
+async def prometheus_metrics():
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/db-pool/stats", status_code=200)
+async def db_pool_stats(
+    current_admin_user: AdminUserProfile = Depends(get_current_user),
+):
+    return db_pool_statistics()
+
+
+# kept for the platform keep-alive ping; like /livez it does no I/O
 @app.get("/health-check", status_code=200)
 async def health_check():
-    await get_members(installation=Installation.akure.value)
     return {"keep_alive": True}
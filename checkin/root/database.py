@@ -1,11 +1,173 @@
+from checkin.root.metrics import instrument_engine
+import checkin.root.query_profiler as query_profiler
 from checkin.root.settings import Settings
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from sqlalchemy import event, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue
+from uuid import uuid4
+import time
 
 settings = Settings()
 
-engine = create_async_engine(url=str(settings.postgres_url))
+DB_POOL_STATS = {
+    "checkouts": 0,
+    "connects": 0,
+    "invalidations": 0,
+    "timeouts": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+
+class TimedQueue(AsyncAdaptedQueue):
+    """The pool's queue of idle connections, timing how long checkouts wait."""
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        start = time.perf_counter()
+        try:
+            return super().get(block=block, timeout=timeout)
+        finally:
+            wait = time.perf_counter() - start
+            DB_POOL_STATS["wait_seconds_total"] += wait
+            DB_POOL_STATS["wait_seconds_max"] = max(
+                DB_POOL_STATS["wait_seconds_max"], wait
+            )
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a free connection.
+
+    Only the wait on the idle queue is timed; opening an overflow connection
+    is not waiting for one.
+    """
+
+    _queue_class = TimedQueue
+
+    def _do_get(self):
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_STATS["timeouts"] += 1
+            raise
+
+
+# transaction pooling (PgBouncer) hands consecutive transactions to different
+# server connections, so connections are recycled often and statements unnamed
+PGBOUNCER_POOL_RECYCLE = 5 * 60
+
+
+def build_engine(
+    url: Optional[str] = None, pgbouncer_mode: Optional[bool] = None
+) -> AsyncEngine:
+    url = make_url(url or str(settings.postgres_url))
+    if pgbouncer_mode is None:
+        pgbouncer_mode = settings.db_pgbouncer_mode
+
+    prepared_statement_cache_size = settings.db_prepared_statement_cache_size
+    pool_recycle = settings.db_pool_recycle
+    connect_args = {}
+    if pgbouncer_mode:
+        # a statement prepared on one server connection is unknown on the next,
+        # and asyncpg's own __asyncpg_stmt_N__ names clash between clients
+        prepared_statement_cache_size = 0
+        pool_recycle = min(pool_recycle, PGBOUNCER_POOL_RECYCLE)
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    return create_async_engine(
+        url=url.update_query_dict(
+            {"prepared_statement_cache_size": str(prepared_statement_cache_size)}
+        ),
+        connect_args=connect_args,
+        poolclass=TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+engine = build_engine()
+instrument_engine(engine)
+if settings.query_profiler_enabled:
+    query_profiler.instrument_engine(engine)
+
+
+@event.listens_for(engine.sync_engine.pool, "connect")
+def _count_connect(dbapi_connection, connection_record):
+    DB_POOL_STATS["connects"] += 1
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_STATS["checkouts"] += 1
+
+
+@event.listens_for(engine.sync_engine.pool, "invalidate")
+def _count_invalidate(dbapi_connection, connection_record, exception):
+    DB_POOL_STATS["invalidations"] += 1
+
+
+def db_pool_statistics():
+    pool = engine.sync_engine.pool
+    return {
+        **DB_POOL_STATS,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+    }
 
 
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], Awaitable]):
+    """Run `callback` once the transaction owning `session` has committed.
+
+    Cache invalidations and counters go through here, so other workers never see
+    a cache entry dropped or bumped for a write that is later rolled back.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@asynccontextmanager
+async def session_scope(
+    session: Optional[AsyncSession] = None,
+) -> AsyncIterator[AsyncSession]:
+    """Share the caller's session, or open one with its own transaction.
+
+    A caller that passes `session` owns the transaction and decides when it is
+    committed; otherwise the transaction commits when the block exits cleanly
+    and rolls back when it raises.
+    """
+    if session is not None:
+        yield session
+        return
+
+    async with async_session() as session:
+        async with session.begin():
+            yield session
+
+        for callback in session.info.pop("after_commit", []):
+            await callback()
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one session and transaction per request.
+
+    The transaction commits after the endpoint returns and rolls back if it
+    raises. No connection is checked out until the first statement runs.
+    """
+    async with session_scope() as session:
+        yield session
@@ -0,0 +1,65 @@
+from checkin.root.database import engine
+from checkin.root.redis_manager import gr_redis
+from checkin.root.settings import Settings
+from sqlalchemy import text
+import asyncio
+import logging
+import time
+
+
+settings = Settings()
+
+LOGGER = logging.getLogger(__name__)
+
+# Readiness is probed by the platform and load balancer every few seconds per
+# worker; results are reused for READYZ_CACHE_SECONDS and concurrent probes
+# share one check instead of each taking a database and Redis connection.
+_readiness: dict = {}
+_readiness_checked_at = float("-inf")
+_readiness_lock = asyncio.Lock()
+
+
+async def _ping_database():
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def _ping_redis():
+    await gr_redis.ping()
+
+
+async def _probe(name: str, ping, timeout: float) -> dict:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(ping(), timeout=timeout)
+    except Exception as e:
+        LOGGER.error(f"readiness probe {name} failed: {e!r}")
+        return {"ok": False, "error": type(e).__name__}
+
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def readiness() -> dict:
+    global _readiness, _readiness_checked_at
+
+    async with _readiness_lock:
+        if time.monotonic() - _readiness_checked_at < settings.readyz_cache_seconds:
+            return _readiness
+
+        database, redis = await asyncio.gather(
+            _probe(
+                name="database",
+                ping=_ping_database,
+                timeout=settings.readyz_database_timeout,
+            ),
+            _probe(
+                name="redis", ping=_ping_redis, timeout=settings.readyz_redis_timeout
+            ),
+        )
+        _readiness = {
+            "ready": database["ok"] and redis["ok"],
+            "database": database,
+            "redis": redis,
+        }
+        _readiness_checked_at = time.monotonic()
+        return _readiness
@@ -0,0 +1,176 @@
+from checkin.root.utils.prometheus import Counter, Gauge, Histogram, Registry
+from functools import wraps
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+import sys
+import time
+
+
+# Per-process metrics, scraped from /metrics; each worker reports its own.
+REGISTRY = Registry()
+
+# database and Redis round trips are mostly sub-millisecond
+QUERY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+)
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route template and status.",
+        labelnames=("method", "route", "status"),
+    )
+)
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template.",
+        labelnames=("method", "route"),
+    )
+)
+SQL_STATEMENT_DURATION = REGISTRY.register(
+    Histogram(
+        "db_statement_duration_seconds",
+        "SQL statement execution time by the db handler that issued it.",
+        labelnames=("handler",),
+        buckets=QUERY_BUCKETS,
+    )
+)
+REDIS_COMMAND_DURATION = REGISTRY.register(
+    Histogram(
+        "redis_command_duration_seconds",
+        "Redis round trip time by gr_redis_utils function.",
+        labelnames=("command",),
+        buckets=QUERY_BUCKETS,
+    )
+)
+PASSWORD_HASH_QUEUE_WAIT = REGISTRY.register(
+    Histogram(
+        "password_hash_queue_wait_seconds",
+        "Time password hashing jobs wait for a worker thread.",
+    )
+)
+PASSWORD_HASH_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "password_hash_jobs_in_flight",
+        "Password hashing jobs queued or running.",
+    )
+)
+PASSWORD_HASH_REJECTED = REGISTRY.register(
+    Counter(
+        "password_hash_rejected_total",
+        "Password hashing jobs refused because the queue was full.",
+    )
+)
+PASSWORD_HASH_JOBS = REGISTRY.register(
+    Counter(
+        "password_hash_jobs_total",
+        "Finished password hashing jobs by outcome (completed or failed).",
+        labelnames=("outcome",),
+    )
+)
+
+DB_HANDLERS_MODULE = "checkin.database.db_handlers."
+
+
+def call_stack(frame):
+    """Frames from `frame` outwards, following SQLAlchemy's async greenlets.
+
+    Cursor events run inside a greenlet whose own stack ends at the greenlet; the
+    awaiting handler and service frames sit in the parent greenlet.
+    """
+    current = getcurrent()
+    while True:
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        if current.parent is None:
+            return
+        current = current.parent
+        frame = current.gr_frame
+
+
+def db_handler_name() -> str:
+    for frame in call_stack(sys._getframe().f_back):
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(DB_HANDLERS_MODULE):
+            return f"{module.removeprefix(DB_HANDLERS_MODULE)}.{frame.f_code.co_name}"
+    return "other"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_handler = db_handler_name()
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    SQL_STATEMENT_DURATION.observe(
+        time.perf_counter() - context._metrics_start,
+        handler=context._metrics_handler,
+    )
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def timed_redis(fn):
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            REDIS_COMMAND_DURATION.observe(
+                time.perf_counter() - start, command=fn.__name__
+            )
+
+    return wrapper
+
+
+class HTTPMetricsMiddleware:
+    """Counts and times requests, labelled by the matched route's path template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        response_status = 500
+
+        async def send_wrapper(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            # raw paths would give every member and attendance uid its own series
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=response_status)
+            HTTP_REQUEST_DURATION.observe(duration, method=method, route=route)
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,167 @@
+from checkin.root.metrics import call_stack
+from checkin.root.settings import Settings
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from typing import Optional
+import logging
+import re
+import sys
+import time
+
+
+settings = Settings()
+
+LOGGER = logging.getLogger(__name__)
+
+# Development and staging only (QUERY_PROFILER_ENABLED): every request gets a
+# QueryProfile through a context variable, which SQLAlchemy's greenlets inherit,
+# so cursor and session events land on the request that caused them.
+CALL_SITE_DEPTH = 3
+
+
+class QueryProfile:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.sessions = 0
+        self.finished = False
+        # normalized statement -> [executions, call sites]
+        self.statements: dict[str, list] = {}
+
+    def record(self, statement: str, duration: float, call_site: str):
+        self.queries += 1
+        self.db_time += duration
+
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, set()]
+        entry[0] += 1
+        entry[1].add(call_site)
+
+    def repeated(self, max_repeats: int) -> list[tuple[str, int, set]]:
+        return sorted(
+            (
+                (statement, count, call_sites)
+                for statement, (count, call_sites) in self.statements.items()
+                if count > max_repeats
+            ),
+            key=lambda x: x[1],
+            reverse=True,
+        )
+
+    def headers(self) -> list[tuple[bytes, bytes]]:
+        return [
+            (b"x-db-queries", str(self.queries).encode()),
+            (b"x-db-time-ms", f"{self.db_time * 1000:.2f}".encode()),
+            (b"x-db-sessions", str(self.sessions).encode()),
+        ]
+
+
+_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_LITERAL = re.compile(r"\$\d+|%\(\w+\)s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_statement(statement: str) -> str:
+    """Same query shape, same key: literals, placeholders and IN lists collapse."""
+    statement = _LITERAL.sub("?", " ".join(statement.split()))
+    return _PLACEHOLDER_LIST.sub("(?)", statement)
+
+
+def call_site() -> str:
+    # the handler and the service calls above it; database.py and this module
+    # are plumbing
+    sites = []
+    for frame in call_stack(sys._getframe().f_back):
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("checkin.") and not module.startswith("checkin.root."):
+            sites.append(
+                f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}:{frame.f_lineno}"
+            )
+            if len(sites) == CALL_SITE_DEPTH:
+                break
+    return " < ".join(sites) or "unknown"
+
+
+def record_statement(statement: str, duration: float):
+    profile = _profile.get()
+    if profile is None or profile.finished:
+        return
+    profile.record(
+        statement=normalize_statement(statement),
+        duration=duration,
+        call_site=call_site(),
+    )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_statement(
+        statement=statement, duration=time.perf_counter() - context._profiler_start
+    )
+
+
+def _count_session(session, transaction, connection):
+    profile = _profile.get()
+    if profile is not None and not profile.finished:
+        profile.sessions += 1
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    # fires once per session transaction that actually takes a connection
+    event.listen(Session, "after_begin", _count_session)
+
+
+def _report(method: str, path: str, profile: QueryProfile):
+    repeated = profile.repeated(max_repeats=settings.query_profiler_max_repeats)
+    db_time_ms = profile.db_time * 1000
+    if (
+        not repeated
+        and profile.queries <= settings.query_profiler_max_queries
+        and db_time_ms <= settings.query_profiler_max_db_time_ms
+    ):
+        return
+
+    lines = [
+        f"{method} {path}: {profile.queries} queries, {db_time_ms:.2f} ms in the "
+        f"database, {profile.sessions} sessions"
+    ]
+    for statement, count, call_sites in repeated:
+        lines.append(f"  {count}x {statement[:200]}")
+        lines.extend(f"    from {site}" for site in sorted(call_sites))
+    LOGGER.warning("\n".join(lines))
+
+
+class QueryProfilerMiddleware:
+    """Adds X-DB-Queries / X-DB-Time-ms / X-DB-Sessions and warns on N+1 shapes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile = QueryProfile()
+        token = _profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *profile.headers()]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # tasks spawned by the request keep the profile; stop counting them
+            profile.finished = True
+            _profile.reset(token)
+            _report(method=scope["method"], path=scope["path"], profile=profile)
@@ -1,7 +1,16 @@
-import redis
+import redis.asyncio as redis
 from checkin.root.settings import Settings
 
 settings = Settings()
 redis_url = str(settings.redis_url)
-gr_redis = redis.Redis(decode_responses=True)
-gr_redis.from_url(url=redis_url)
+# one sized pool per process, shared by every request; the revocation and admin
+# invalidation subscribers pin two connections for good. A burst beyond the
+# limit waits for a free connection instead of failing with "Too many
+# connections", and only raises once redis_pool_timeout has passed.
+redis_pool = redis.BlockingConnectionPool.from_url(
+    url=redis_url,
+    max_connections=settings.redis_max_connections,
+    timeout=settings.redis_pool_timeout,
+    decode_responses=True,
+)
+gr_redis = redis.Redis(connection_pool=redis_pool)
@@ -5,13 +5,62 @@ from pydantic import EmailStr
 
 class Settings(AbstractSettings):
     postgres_url: PostgresDsn
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 30 * 60
+    db_pool_pre_ping: bool = True
+    db_prepared_statement_cache_size: int = 100
+    # set when POSTGRES_URL points at PgBouncer in transaction pooling mode
+    db_pgbouncer_mode: bool = False
     redis_url: RedisDsn
+    redis_max_connections: int = 50
+    # seconds a command waits for a free pooled connection before failing
+    redis_pool_timeout: float = 5.0
+    # /readyz probe timeouts and how long a probe result is reused
+    readyz_database_timeout: float = 1.0
+    readyz_redis_timeout: float = 0.5
+    readyz_cache_seconds: float = 2.0
+    # development and staging: per-request SQL counts and N+1 warnings
+    query_profiler_enabled: bool = False
+    query_profiler_max_queries: int = 25
+    query_profiler_max_db_time_ms: float = 250
+    query_profiler_max_repeats: int = 5
     jwt_secret_key: str
     ref_jwt_secret_key: str
     second_signer_key: str
+    # issue single-HMAC compact access tokens; both formats are always accepted
+    compact_access_tokens: bool = False
+    # verified bearer tokens are trusted in-process for at most this many seconds
+    token_cache_ttl: int = 60
+    token_cache_max_size: int = 1024
+    # set from `python -m bin.calibrate_bcrypt` on the deployment host
+    bcrypt_rounds: int = 12
+    password_hash_budget_ms: int = 250
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+    revocation_filter_capacity: int = 100_000
+    revocation_filter_error_rate: float = 0.001
+    revocation_filter_rebuild_seconds: int = 60 * 60
+    # admin profiles are also cached in Redis and invalidated over pub/sub
+    admin_cache_ttl: int = 60
+    admin_cache_max_size: int = 256
     mail_username: str
     mail_password: str
     mail_from: EmailStr
     mail_from_name: str
     mail_port: int
     mail_server: str
+    mail_starttls: bool = True
+    mail_use_credentials: bool = True
+    # outgoing mail is queued in-process and sent over persistent SMTP sessions
+    mail_queue_max_size: int = 1000
+    mail_smtp_connections: int = 2
+    mail_max_attempts: int = 5
+    mail_retry_backoff_seconds: float = 1.0
+    campaign_messages_per_second: float = 10
+    campaign_smtp_connections: int = 4
+    campaign_render_workers: int = 2
+    campaign_batch_size: int = 500
+    # finished campaigns stay readable from GET /v1/campaigns for this long
+    campaign_retention_seconds: int = 24 * 60 * 60
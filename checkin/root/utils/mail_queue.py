@@ -0,0 +1,212 @@
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+from jinja2 import Environment, FileSystemLoader
+from checkin.root.settings import Settings
+import aiosmtplib
+import asyncio
+import logging
+import random
+
+
+settings = Settings()
+
+LOGGER = logging.getLogger(__name__)
+
+SMTP_TIMEOUT = 30
+MAX_RETRY_BACKOFF = 60
+
+# In-process outbox: callers enqueue a rendered message and return immediately,
+# a few workers each keep one SMTP session open and deliver from the queue.
+# The queue is bounded; enqueue_message raises asyncio.QueueFull when it is.
+mail_queue: Optional[asyncio.Queue] = None
+MAIL_QUEUE_STATS = {
+    "queued": 0,
+    "sent": 0,
+    "retried": 0,
+    "failed": 0,
+    "rejected": 0,
+    "connections_opened": 0,
+}
+
+_workers: list[asyncio.Task] = []
+
+
+def mail_queue_statistics():
+    return {
+        **MAIL_QUEUE_STATS,
+        "depth": mail_queue.qsize() if mail_queue is not None else 0,
+    }
+
+
+@lru_cache
+def template_environment() -> Environment:
+    return Environment(
+        loader=FileSystemLoader(Path(__file__).parent.parent / "templates"),
+        autoescape=True,
+    )
+
+
+def render_mail(
+    subject: str, reciepients: List[str], payload: dict, template: str
+) -> EmailMessage:
+    html = template_environment().get_template(template).render(**payload)
+
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = f"{settings.mail_from_name} <{settings.mail_from}>"
+    message["To"] = ", ".join(reciepients)
+    message["Date"] = formatdate(localtime=True)
+    message["Message-ID"] = make_msgid()
+    message.set_content(html, subtype="html")
+    return message
+
+
+def render_member_mails(
+    subject: str, template: str, payload: dict, members: List[dict]
+) -> List[EmailMessage]:
+    """One mail per member, rendered with the member's fields as `member`.
+
+    Runs in a worker process for campaigns, so it must only take picklable input.
+    """
+    return [
+        render_mail(
+            subject=subject,
+            reciepients=[member["email"]],
+            payload={**payload, "member": member},
+            template=template,
+        )
+        for member in members
+    ]
+
+
+def enqueue_message(message: EmailMessage):
+    if mail_queue is None:
+        raise RuntimeError("mail queue is not started")
+
+    try:
+        mail_queue.put_nowait(message)
+    except asyncio.QueueFull:
+        MAIL_QUEUE_STATS["rejected"] += 1
+        LOGGER.error(f"mail queue full, dropped mail to {message['To']}")
+        raise
+
+    MAIL_QUEUE_STATS["queued"] += 1
+
+
+def enqueue_mail(subject: str, reciepients: List[str], payload: dict, template: str):
+    enqueue_message(
+        message=render_mail(
+            subject=subject,
+            reciepients=reciepients,
+            payload=payload,
+            template=template,
+        )
+    )
+
+
+async def connect_smtp() -> aiosmtplib.SMTP:
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.mail_server,
+        port=settings.mail_port,
+        start_tls=settings.mail_starttls,
+        timeout=SMTP_TIMEOUT,
+    )
+    await smtp.connect()
+    if settings.mail_use_credentials:
+        await smtp.login(settings.mail_username, settings.mail_password)
+
+    MAIL_QUEUE_STATS["connections_opened"] += 1
+    return smtp
+
+
+def _is_permanent(error: Exception) -> bool:
+    # 5xx replies (unknown mailbox, rejected content) will not succeed on retry
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(recipient.code >= 500 for recipient in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+def retry_backoff(attempt: int) -> float:
+    backoff = settings.mail_retry_backoff_seconds * 2 ** (attempt - 1)
+    return min(backoff, MAX_RETRY_BACKOFF) * random.uniform(0.5, 1.0)
+
+
+async def deliver(
+    smtp: Optional[aiosmtplib.SMTP], message: EmailMessage
+) -> tuple[Optional[aiosmtplib.SMTP], bool]:
+    """Send one message, reconnecting and backing off between attempts.
+
+    Returns the connection to reuse for the next message and whether it was sent.
+    """
+    for attempt in range(1, settings.mail_max_attempts + 1):
+        try:
+            if smtp is None or not smtp.is_connected:
+                smtp = await connect_smtp()
+            await smtp.send_message(message)
+            MAIL_QUEUE_STATS["sent"] += 1
+            return smtp, True
+        except (aiosmtplib.SMTPException, OSError) as e:
+            LOGGER.exception(e)
+            if smtp is not None:
+                smtp.close()
+                smtp = None
+
+            if _is_permanent(error=e) or attempt == settings.mail_max_attempts:
+                break
+
+            MAIL_QUEUE_STATS["retried"] += 1
+            await asyncio.sleep(retry_backoff(attempt=attempt))
+
+    MAIL_QUEUE_STATS["failed"] += 1
+    LOGGER.error(f"mail to {message['To']} failed, subject: {message['Subject']}")
+    return smtp, False
+
+
+async def _send_worker(queue: asyncio.Queue):
+    smtp = None
+    try:
+        while True:
+            message = await queue.get()
+            try:
+                smtp, _ = await deliver(smtp=smtp, message=message)
+            except Exception as e:
+                # deliver handles SMTP and socket errors; anything else would end
+                # this worker and leave the queue to the others
+                LOGGER.exception(e)
+                LOGGER.error(f"mail to {message['To']} failed, dropping the session")
+                MAIL_QUEUE_STATS["failed"] += 1
+                if smtp is not None:
+                    smtp.close()
+                    smtp = None
+            finally:
+                queue.task_done()
+    finally:
+        if smtp is not None and smtp.is_connected:
+            smtp.close()
+
+
+async def start():
+    global mail_queue
+
+    mail_queue = asyncio.Queue(maxsize=settings.mail_queue_max_size)
+    _workers.extend(
+        asyncio.create_task(_send_worker(queue=mail_queue))
+        for _ in range(settings.mail_smtp_connections)
+    )
+
+
+async def stop(timeout: float = 10):
+    """Give queued mail a chance to go out, then close the SMTP sessions."""
+    if mail_queue is not None:
+        try:
+            await asyncio.wait_for(mail_queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            LOGGER.error(f"{mail_queue.qsize()} queued mails dropped on shutdown")
+
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -0,0 +1,16 @@
+import asyncio
+
+
+class RateLimiter:
+    """Spaces acquisitions `1 / rate` seconds apart across every caller."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
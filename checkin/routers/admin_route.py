@@ -16,6 +16,10 @@ from fastapi import (
     UploadFile,
 )
 from checkin.services.service_utils.auth_utils import get_current_user
+import checkin.services.service_utils.revocation_filter as revocation_filter
+import checkin.services.service_utils.admin_profile_cache as admin_profile_cache
+from checkin.root.database import get_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 api_router = APIRouter(prefix="/v1/auth", tags=["Admin Authentication"])
@@ -26,8 +30,12 @@ api_router = APIRouter(prefix="/v1/auth", tags=["Admin Authentication"])
     response_model=schemas.UserAccessToken,
     status_code=status.HTTP_201_CREATED,
 )
-async def admin_sign_up(admin_user: schemas.AdminUser):
-    return await admin_auth_service.admin_sign_up(admin_user=admin_user)
+async def admin_sign_up(
+    admin_user: schemas.AdminUser, session: AsyncSession = Depends(get_session)
+):
+    return await admin_auth_service.admin_sign_up(
+        admin_user=admin_user, session=session
+    )
 
 
 @api_router.post(
@@ -70,6 +78,20 @@ async def admin_logout(
     )
 
 
+@api_router.get("/revocation-filter/stats", status_code=status.HTTP_200_OK)
+async def revocation_filter_stats(
+    current_admin_user: schemas.AdminUserProfile = Depends(get_current_user),
+):
+    return revocation_filter.revocation_filter_statistics()
+
+
+@api_router.get("/admin-cache/stats", status_code=status.HTTP_200_OK)
+async def admin_cache_stats(
+    current_admin_user: schemas.AdminUserProfile = Depends(get_current_user),
+):
+    return admin_profile_cache.admin_cache_statistics()
+
+
 @api_router.post("/forgot-password", status_code=status.HTTP_200_OK)
 async def forgot_password(
     email: schemas.EmailStr = Body(embed=True, example="agent@gr.com")
@@ -85,7 +107,8 @@ async def forgot_password(
 async def reset_password(
     token: constr(max_length=4, min_length=4) = Body(embed=True, example=1345),
     new_password: str = Body(embed=True),
+    session: AsyncSession = Depends(get_session),
 ):
     return await admin_auth_service.reset_password(
-        token=token, new_password=new_password
+        token=token, new_password=new_password, session=session
     )
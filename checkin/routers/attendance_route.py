@@ -12,8 +12,12 @@ from checkin.schemas.member_schemas import (
     NewMember,
 )
 from checkin.schemas.auth_schemas import AdminUserProfile
+from checkin.schemas.commons_schemas import PaginatedQuery
 from checkin.services.service_utils.auth_utils import get_current_user
+from checkin.root.database import get_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from typing import Optional
 
 api_router = APIRouter(prefix="/v1/attendance", tags=["Attendance Management"])
 
@@ -27,9 +31,10 @@ async def admin_member_checkin(
     member: Member,
     installation: Installation = Header(Installation),
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
     return await attendance_service.member_checkin(
-        member=member, installation=installation
+        member=member, installation=installation, session=session
     )
 
 
@@ -42,9 +47,10 @@ async def admin_new_member_checkin(
     new_member: NewMember,
     installation: Installation = Header(Installation),
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
     return await attendance_service.create_first_time_member(
-        new_member=new_member, installation=installation
+        new_member=new_member, installation=installation, session=session
     )
 
 
@@ -52,9 +58,18 @@ async def admin_new_member_checkin(
     "s/", status_code=status.HTTP_200_OK, response_model=PaginatedMemberProfile
 )
 async def get_members(
+    paginated_query: PaginatedQuery = Depends(),
+    cursor: Optional[str] = None,
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
-    return await attendance_service.get_members(installation=admin_profile.installation)
+    return await attendance_service.get_members(
+        installation=admin_profile.installation,
+        limit=paginated_query.limit,
+        offset=paginated_query.offset,
+        cursor=cursor,
+        session=session,
+    )
 
 
 @api_router.get(
@@ -65,8 +80,11 @@ async def get_members(
 async def get_member(
     member_uid: UUID,
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
-    return await attendance_service.get_member_via_member_uid(member_uid=member_uid)
+    return await attendance_service.get_member_via_member_uid(
+        member_uid=member_uid, session=session
+    )
 
 
 @api_router.patch(
@@ -78,9 +96,10 @@ async def update_member(
     member_uid: UUID,
     member_update: MemberUpdate,
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
     return await attendance_service.update_member(
-        member_uid=member_uid, member_update=member_update
+        member_uid=member_uid, member_update=member_update, session=session
     )
 
 
@@ -91,8 +110,11 @@ async def update_member(
 async def delete_member(
     member_uid: UUID,
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
-    return await attendance_service.delete_member(member_uid=member_uid)
+    return await attendance_service.delete_member(
+        member_uid=member_uid, session=session
+    )
 
 
 @api_router.get(
@@ -100,12 +122,20 @@ async def delete_member(
 )
 async def get_member_dashboard(
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
     return await attendance_service.admin_dashboard_statistics(
-        installation=admin_profile.installation
+        installation=admin_profile.installation, session=session
     )
 
 
+@api_router.get("s/dashboard/cache-stats", status_code=status.HTTP_200_OK)
+async def get_dashboard_cache_stats(
+    admin_profile: AdminUserProfile = Depends(get_current_user),
+):
+    return attendance_service.dashboard_cache_statistics()
+
+
 @api_router.patch(
     "s/{uid}", status_code=status.HTTP_200_OK, response_model=AttendanceProfile
 )
@@ -113,7 +143,8 @@ async def update_attendance_profile(
     uid: UUID,
     attendance_update: AttendanceUpdate,
     admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
     return await attendance_service.update_attendance_via_uid(
-        attendance_uid=uid, attendance_update=attendance_update
+        attendance_uid=uid, attendance_update=attendance_update, session=session
     )
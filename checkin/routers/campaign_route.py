@@ -0,0 +1,61 @@
+import checkin.services.campaign_service as campaign_service
+from fastapi import APIRouter, status, Depends
+from checkin.schemas.auth_schemas import AdminUserProfile
+from checkin.schemas.campaign_schemas import MailCampaign, MailCampaignProgress
+from checkin.services.service_utils.auth_utils import get_current_user
+from uuid import UUID
+
+api_router = APIRouter(prefix="/v1/campaigns", tags=["Mail Campaigns"])
+
+
+@api_router.post(
+    "",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=MailCampaignProgress,
+)
+async def start_campaign(
+    campaign: MailCampaign,
+    admin_profile: AdminUserProfile = Depends(get_current_user),
+):
+    return await campaign_service.start_campaign(
+        campaign=campaign, admin_profile=admin_profile
+    )
+
+
+@api_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=list[MailCampaignProgress],
+)
+async def list_campaigns(
+    admin_profile: AdminUserProfile = Depends(get_current_user),
+):
+    return campaign_service.list_campaigns(admin_profile=admin_profile)
+
+
+@api_router.get(
+    "/{campaign_uid}",
+    status_code=status.HTTP_200_OK,
+    response_model=MailCampaignProgress,
+)
+async def get_campaign(
+    campaign_uid: UUID,
+    admin_profile: AdminUserProfile = Depends(get_current_user),
+):
+    return campaign_service.get_campaign(
+        campaign_uid=campaign_uid, admin_profile=admin_profile
+    )
+
+
+@api_router.delete(
+    "/{campaign_uid}",
+    status_code=status.HTTP_200_OK,
+    response_model=MailCampaignProgress,
+)
+async def cancel_campaign(
+    campaign_uid: UUID,
+    admin_profile: AdminUserProfile = Depends(get_current_user),
+):
+    return await campaign_service.cancel_campaign(
+        campaign_uid=campaign_uid, admin_profile=admin_profile
+    )
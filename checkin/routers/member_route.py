@@ -1,7 +1,9 @@
 import checkin.services.member_service as member_service
+from checkin.root.database import get_session
+from checkin.schemas.auth_schemas import AdminUserProfile
 from checkin.schemas.member_schemas import (
     Member,
-    MemberProfile,
+    MemberSearchResult,
     MemberExtendedProfile,
     NewMember,
     Installation,
@@ -11,7 +13,10 @@ from fastapi import (
     status,
     Depends,
     Header,
+    Query,
 )
+from checkin.services.service_utils.auth_utils import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 api_router = APIRouter(prefix="/v1/members", tags=["Member Management"])
@@ -23,10 +28,12 @@ api_router = APIRouter(prefix="/v1/members", tags=["Member Management"])
     response_model=MemberExtendedProfile,
 )
 async def add_first_timer(
-    new_member: NewMember, installation: Installation = Installation
+    new_member: NewMember,
+    installation: Installation = Installation,
+    session: AsyncSession = Depends(get_session),
 ):
     return await member_service.create_first_time_member(
-        new_member=new_member, installation=installation
+        new_member=new_member, installation=installation, session=session
     )
 
 
@@ -36,12 +43,14 @@ async def add_first_timer(
     response_model=MemberExtendedProfile,
 )
 async def token_member_checkin(
-    checkin_token: str = Header(), installation: Installation = Installation
+    checkin_token: str = Header(),
+    installation: Installation = Installation,
+    session: AsyncSession = Depends(get_session),
 ):
     # depends on the Query
 
     return await member_service.member_checkin_via_checkin_token(
-        checkin_token=checkin_token, installation=installation
+        checkin_token=checkin_token, installation=installation, session=session
     )
 
 
@@ -50,8 +59,34 @@ async def token_member_checkin(
     status_code=status.HTTP_200_OK,
     response_model=MemberExtendedProfile,
 )
-async def member_checkin(member: Member, installation: Installation = Installation):
-    return await member_service.member_checkin(member=member, installation=installation)
+async def member_checkin(
+    member: Member,
+    installation: Installation = Installation,
+    session: AsyncSession = Depends(get_session),
+):
+    return await member_service.member_checkin(
+        member=member, installation=installation, session=session
+    )
+
+
+@api_router.get(
+    path="/search",
+    status_code=status.HTTP_200_OK,
+    response_model=list[MemberSearchResult],
+)
+async def search_members(
+    q: str = Query(min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    admin_profile: AdminUserProfile = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    # admins only see their own installation; GLOBAL admins see every one
+    return await member_service.search_members(
+        query=q,
+        installation=admin_profile.installation,
+        limit=limit,
+        session=session,
+    )
 
 
 # Update  Record
@@ -37,8 +37,8 @@ class AdminUser(Login):
 
 class AdminUserProfile(AdminUser):
     admin_uid: UUID
-    # excluding password
-    password: str = Field(exclude=True)
+    # excluding password; None on cached profiles, which never carry the hash
+    password: Optional[str] = Field(default=None, exclude=True)
     email: EmailStr = Field(exclude=True)
 
 
@@ -55,6 +55,8 @@ class AdminUserUpdate(AbstractModel):
 
 class TokenData(AbstractModel):
     admin_uid: UUID
+    exp: Optional[int] = None
+    token_id: Optional[str] = None
 
 
 class AdminProfile(AbstractModel):
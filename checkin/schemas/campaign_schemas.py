@@ -0,0 +1,43 @@
+from checkin.root.utils.base_schemas import AbstractModel
+from checkin.schemas.commons_schemas import Installation
+from pydantic import confloat
+from datetime import date, datetime
+from enum import Enum
+from uuid import UUID
+from typing import Optional
+
+
+class MemberSegment(AbstractModel):
+    installation: Installation
+    first_timers_only: bool = False
+    joined_since: Optional[date] = None
+
+
+class MailCampaign(AbstractModel):
+    subject: str
+    # any template under root/templates; it renders with `payload` and `member`
+    template: str
+    payload: dict = {}
+    segment: MemberSegment
+    messages_per_second: Optional[confloat(gt=0)] = None
+
+
+class CampaignStatus(str, Enum):
+    running = "RUNNING"
+    completed = "COMPLETED"
+    failed = "FAILED"
+    cancelled = "CANCELLED"
+
+
+class MailCampaignProgress(AbstractModel):
+    campaign_uid: UUID
+    # the admin who started it; only they (and GLOBAL admins) can see it
+    admin_uid: UUID
+    subject: str
+    segment: MemberSegment
+    status: CampaignStatus = CampaignStatus.running
+    recipients: int = 0
+    sent: int = 0
+    failed: int = 0
+    started_at: datetime
+    finished_at: Optional[datetime] = None
@@ -5,7 +5,7 @@ from pydantic import conint
 
 
 class PaginatedQuery(AbstractModel):
-    limit: conint(ge=0) = 10
+    limit: conint(ge=1) = 10
     offset: conint(ge=0) = 0
 
 
@@ -45,6 +45,13 @@ class MemberProfile(NewMember):
     date_created_utc: datetime
 
 
+class MemberSearchResult(Member):
+    # enough to pick the right member; tokens and free-text fields stay out
+    member_uid: UUID
+    is_first_time: bool
+    installation: Installation
+
+
 class MemberUpdate(AbstractModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -96,6 +103,7 @@ class MemberExtendedProfile(MemberProfile):
 class PaginatedMemberProfile(AbstractModel):
     result_set: List[MemberExtendedProfile] = []
     result_size: int = 0
+    next_cursor: Optional[str] = None
 
 
 class AdminMemberStatistics(AbstractModel):
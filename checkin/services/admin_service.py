@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from checkin.schemas.auth_schemas import (
     AdminUser,
@@ -6,41 +7,80 @@ from checkin.schemas.auth_schemas import (
 )
 import checkin.database.db_handlers.admin_db_handler as admin_user_db_handler
 from uuid import UUID
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from checkin.root.database import run_after_commit, session_scope
 from fastapi import HTTPException, status
 from checkin.services.service_utils.exception_collection import (
+    DeleteError,
     NotFound,
     UpdateError,
 )
 import checkin.services.service_utils.gr_redis_utils as redis_utils
 import checkin.services.service_error_enums as service_errors
 import checkin.services.service_utils.auth_utils as auth_utils
+import checkin.services.service_utils.admin_profile_cache as admin_profile_cache
 import checkin.services.service_utils.token_utils as gr_toks_utils
-from checkin.root.utils.mailer import send_mail
+import checkin.root.utils.mail_queue as mail_queue
 
 LOGGER = logging.getLogger(__name__)
 
+# rehashed passwords are stored after the login response; hold the tasks until done
+_rehash_tasks: set[asyncio.Task] = set()
+
+
+async def get_admin_user_by_mail(email: str, session: AsyncSession = None):
+    admin_profile = await admin_profile_cache.get_admin_profile_by_email(email=email)
+    if admin_profile is not None:
+        return admin_profile
 
-async def get_admin_user_by_mail(email: str):
     try:
-        return await admin_user_db_handler.get_admin(email=email)
+        admin_profile = await admin_user_db_handler.get_admin(
+            email=email, session=session
+        )
     except NotFound as e:
         LOGGER.exception(e)
         LOGGER.error("Admin not found")
         raise HTTPException(**service_errors.ErrorEnum.admin_not_found())
 
+    await admin_profile_cache.cache_admin_profile(admin_profile=admin_profile)
+    return admin_profile
+
+
+async def get_admin_user(admin_uid: UUID, session: AsyncSession = None):
+    admin_profile = await admin_profile_cache.get_admin_profile(admin_uid=admin_uid)
+    if admin_profile is not None:
+        return admin_profile
 
-async def get_admin_user(admin_uid: UUID):
     try:
-        return await admin_user_db_handler.get_admin_profile(admin_uid=admin_uid)
+        admin_profile = await admin_user_db_handler.get_admin_profile(
+            admin_uid=admin_uid, session=session
+        )
     except NotFound as e:
         LOGGER.exception(e)
         LOGGER.error("Agent not found")
 
         raise HTTPException(**service_errors.ErrorEnum.admin_not_found())
 
+    await admin_profile_cache.cache_admin_profile(admin_profile=admin_profile)
+    return admin_profile
+
+
+async def _invalidate_admin_profile(
+    admin_uid: UUID, session: Optional[AsyncSession] = None
+):
+    async def invalidate():
+        await admin_profile_cache.invalidate_admin_profile(admin_uid=admin_uid)
+
+    # a reader must not re-cache the old profile before the write is visible
+    if session is None:
+        await invalidate()
+    else:
+        run_after_commit(session=session, callback=invalidate)
+
 
 # create record
-async def admin_sign_up(admin_user: AdminUser):
+async def admin_sign_up(admin_user: AdminUser, session: AsyncSession = None):
     """Create Admin Token
 
     Args:
@@ -52,57 +92,81 @@ async def admin_sign_up(admin_user: AdminUser):
     Returns:
         _type_: _description_
     """
-    try:
-        admin_profile = await admin_user_db_handler.get_admin(email=admin_user.email)
-        if admin_profile:
-            LOGGER.error("Admin Account: exists")
+    # hashed before any query, so no connection idles in a transaction meanwhile
+    hashed_password = await auth_utils.hash_password(plain_password=admin_user.password)
 
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Account for this admin cred exists",
-            )
-
-    # else create record
-    except NotFound:
+    async with session_scope(session) as session:
         try:
-            admin_profile = await admin_user_db_handler.get_admin_via_phone_number(
-                phone_number=admin_user.phone_number
+            admin_profile = await admin_user_db_handler.get_admin(
+                email=admin_user.email, session=session
             )
-
             if admin_profile:
                 LOGGER.error("Admin Account: exists")
 
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Account for this admin's phone_number cred exists",
+                    detail="Account for this admin cred exists",
                 )
+
+        # else create record
         except NotFound:
-            admin_user.password = auth_utils.hash_password(
-                plain_password=admin_user.password
-            )
+            try:
+                admin_profile = await admin_user_db_handler.get_admin_via_phone_number(
+                    phone_number=admin_user.phone_number, session=session
+                )
 
-            admin_profile = await admin_user_db_handler.create_admin(
-                admin_user=admin_user
-            )
-            admin_profile_dict = {"admin_uid": str(admin_profile.admin_uid)}
-            access_token, refresh_token = (
-                auth_utils.create_access_token(data=admin_profile_dict),
-                auth_utils.create_refresh_token(data=admin_profile_dict),
-            )
+                if admin_profile:
+                    LOGGER.error("Admin Account: exists")
 
-            return UserAccessToken(
-                access_token=access_token, refresh_token=refresh_token
-            )
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Account for this admin's phone_number cred exists",
+                    )
+            except NotFound:
+                admin_user.password = hashed_password
+
+                admin_profile = await admin_user_db_handler.create_admin(
+                    admin_user=admin_user, session=session
+                )
+                await _invalidate_admin_profile(
+                    admin_uid=admin_profile.admin_uid, session=session
+                )
+                admin_profile_dict = {"admin_uid": str(admin_profile.admin_uid)}
+                access_token, refresh_token = (
+                    auth_utils.create_access_token(data=admin_profile_dict),
+                    auth_utils.create_refresh_token(data=admin_profile_dict),
+                )
+
+                return UserAccessToken(
+                    access_token=access_token, refresh_token=refresh_token
+                )
 
 
 # login
 async def admin_login(email: str, password: str):
-    admin_profile = await get_admin_user_by_mail(email=email)
-    if not auth_utils.verify_password(
+    # the hash always comes from Postgres; cached profiles do not carry it
+    try:
+        admin_profile = await admin_user_db_handler.get_admin(email=email)
+    except NotFound as e:
+        LOGGER.exception(e)
+        LOGGER.error("Admin not found")
+        raise HTTPException(**service_errors.ErrorEnum.admin_not_found())
+
+    verified, rehashed_password = await auth_utils.verify_and_update_password(
         hashed_password=admin_profile.password, plain_password=password
-    ):
+    )
+    if not verified:
         raise HTTPException(**service_errors.ErrorEnum.incorrect_credential())
 
+    if rehashed_password:
+        task = asyncio.create_task(
+            _store_rehashed_password(
+                admin_uid=admin_profile.admin_uid, hashed_password=rehashed_password
+            )
+        )
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+
     payload_dict = {
         "admin_uid": str(admin_profile.admin_uid),
         "email": admin_profile.email,
@@ -115,6 +179,17 @@ async def admin_login(email: str, password: str):
     return UserAccessToken(access_token=access_token, refresh_token=refresh_token)
 
 
+async def _store_rehashed_password(admin_uid: UUID, hashed_password: str):
+    try:
+        await admin_update(
+            admin_update=AdminUserUpdate(password=hashed_password),
+            admin_user_uid=admin_uid,
+        )
+    except HTTPException as e:
+        LOGGER.exception(e)
+        LOGGER.error(f"rehashed password not stored for admin {admin_uid}")
+
+
 # forget password
 async def forgot_password(email: str):
     await get_admin_user_by_mail(email=email)
@@ -122,49 +197,78 @@ async def forgot_password(email: str):
     # Create a Token 4 OTP
     token = gr_toks_utils.gr_token_gen()
 
-    redis_utils.add_forget_admin_token(token=token, email=email)
+    await redis_utils.add_forget_admin_token(token=token, email=email)
     # send mail
 
-    await send_mail(
-        subject="Forgot Password",
-        reciepients=[email],
-        payload={"token": token},
-        template="user_auth/token_email_template.html",
-    )
+    # the mail goes out from the queue workers, not within this request
+    try:
+        mail_queue.enqueue_mail(
+            subject="Forgot Password",
+            reciepients=[email],
+            payload={"token": token},
+            template="user_auth/token_email_template.html",
+        )
+    except asyncio.QueueFull:
+        raise HTTPException(**service_errors.ErrorEnum.mail_queue_full())
     return {"messge": "mail sent"}
 
     ...
 
 
-async def admin_update(admin_update: AdminUserUpdate, admin_user_uid: UUID):
+async def admin_update(
+    admin_update: AdminUserUpdate, admin_user_uid: UUID, session: AsyncSession = None
+):
     try:
-        return await admin_user_db_handler.update_agent(
-            admin_user_update=admin_update, admin_user_uid=admin_user_uid
-        )
+        async with session_scope(session) as session:
+            admin_profile = await admin_user_db_handler.update_agent(
+                admin_user_update=admin_update,
+                admin_uid=admin_user_uid,
+                session=session,
+            )
+            await _invalidate_admin_profile(admin_uid=admin_user_uid, session=session)
+        return admin_profile
     except UpdateError as e:
         LOGGER.exception(e)
         LOGGER.error("unexplainable update error")
         raise HTTPException(**service_errors.ErrorEnum.admin_not_found())
 
 
-async def reset_password(token: int, new_password: str):
-    email = redis_utils.get_forget_admin_token(token=token)
+async def admin_delete(admin_uid: UUID, session: AsyncSession = None):
+    try:
+        async with session_scope(session) as session:
+            admin_profile = await admin_user_db_handler.delete_admin(
+                admin_uid=admin_uid, session=session
+            )
+            await _invalidate_admin_profile(admin_uid=admin_uid, session=session)
+    except DeleteError as e:
+        LOGGER.exception(e)
+        LOGGER.error(f"admin {admin_uid} not deleted")
+        raise HTTPException(**service_errors.ErrorEnum.admin_not_found())
+
+    return admin_profile
+
+
+async def reset_password(token: int, new_password: str, session: AsyncSession = None):
+    email = await redis_utils.get_forget_admin_token(token=token)
     if not email:
         LOGGER.error(f"forgot password token: {token} not valid")
         raise HTTPException(**service_errors.ErrorEnum.redis_not_found())
 
-    admin_profile = await get_admin_user_by_mail(email=email)
+    # hashed before any query, so no connection idles in a transaction meanwhile
+    new_password = await auth_utils.hash_password(plain_password=new_password)
 
-    new_password = auth_utils.hash_password(plain_password=new_password)
-    updated_admin_profile = await admin_update(
-        admin_update=AdminUserUpdate(password=new_password),
-        admin_user_uid=admin_profile.admin_uid,
-    )
+    async with session_scope(session) as session:
+        admin_profile = await get_admin_user_by_mail(email=email, session=session)
+        updated_admin_profile = await admin_update(
+            admin_update=AdminUserUpdate(password=new_password),
+            admin_user_uid=admin_profile.admin_uid,
+            session=session,
+        )
     return updated_admin_profile
 
 
 async def admin_logout(access_token: str, refresh_token: str):
-    redis_utils.add_token_blacklist(
+    await auth_utils.revoke_tokens(
         access_token=access_token, refresh_token=refresh_token
     )
 
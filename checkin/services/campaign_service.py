@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+from contextlib import aclosing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from jinja2 import TemplateNotFound
+
+import checkin.database.db_handlers.member_db_handler as member_db_handler
+import checkin.root.utils.mail_queue as mail_queue
+from checkin.root.settings import Settings
+from checkin.root.utils.rate_limiter import RateLimiter
+from checkin.schemas.auth_schemas import AdminUserProfile
+from checkin.schemas.campaign_schemas import (
+    CampaignStatus,
+    MailCampaign,
+    MailCampaignProgress,
+)
+from checkin.schemas.commons_schemas import Installation
+
+LOGGER = logging.getLogger(__name__)
+
+settings = Settings()
+
+# Campaign pipeline: the segment is read in keyset-paged batches, worker
+# processes render each batch, and SMTP senders (one persistent session each)
+# drain a bounded queue under a shared messages-per-second limit. The bounded
+# queue holds the next page back while sending is the bottleneck.
+#
+# Campaigns are single-worker: progress lives in the process that started the
+# campaign, so reading or cancelling it from another worker returns 404, and a
+# restart forgets it. Finished campaigns are evicted after
+# CAMPAIGN_RETENTION_SECONDS.
+render_executor = ProcessPoolExecutor(
+    max_workers=settings.campaign_render_workers,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+campaigns: dict[UUID, MailCampaignProgress] = {}
+_campaign_tasks: dict[UUID, asyncio.Task] = {}
+
+
+async def _produce(
+    campaign: MailCampaign, progress: MailCampaignProgress, outbox: asyncio.Queue
+):
+    loop = asyncio.get_running_loop()
+    segment_members = member_db_handler.stream_segment_members(
+        installation=campaign.segment.installation,
+        first_timers_only=campaign.segment.first_timers_only,
+        joined_since=campaign.segment.joined_since,
+        batch_size=settings.campaign_batch_size,
+    )
+    async with aclosing(segment_members):
+        async for members in segment_members:
+            progress.recipients += len(members)
+            # spread each batch over the render processes
+            chunk_size = math.ceil(len(members) / settings.campaign_render_workers)
+            rendered = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        render_executor,
+                        mail_queue.render_member_mails,
+                        campaign.subject,
+                        campaign.template,
+                        campaign.payload,
+                        members[index : index + chunk_size],
+                    )
+                    for index in range(0, len(members), chunk_size)
+                )
+            )
+            for messages in rendered:
+                for message in messages:
+                    await outbox.put(message)
+
+
+async def _send(
+    progress: MailCampaignProgress, outbox: asyncio.Queue, limiter: RateLimiter
+):
+    smtp = None
+    try:
+        while True:
+            message = await outbox.get()
+            try:
+                await limiter.acquire()
+                smtp, sent = await mail_queue.deliver(smtp=smtp, message=message)
+            except Exception as e:
+                # a dead sender leaves the outbox undrained and the campaign RUNNING
+                LOGGER.exception(e)
+                LOGGER.error(
+                    f"campaign {progress.campaign_uid}: mail to {message['To']} failed"
+                )
+                if smtp is not None:
+                    smtp.close()
+                    smtp = None
+                sent = False
+
+            if sent:
+                progress.sent += 1
+            else:
+                progress.failed += 1
+            outbox.task_done()
+    finally:
+        if smtp is not None and smtp.is_connected:
+            smtp.close()
+
+
+async def _run_campaign(campaign: MailCampaign, progress: MailCampaignProgress):
+    outbox = asyncio.Queue(maxsize=settings.campaign_batch_size)
+    limiter = RateLimiter(
+        rate=campaign.messages_per_second or settings.campaign_messages_per_second
+    )
+    senders = [
+        asyncio.create_task(_send(progress=progress, outbox=outbox, limiter=limiter))
+        for _ in range(settings.campaign_smtp_connections)
+    ]
+
+    try:
+        await _produce(campaign=campaign, progress=progress, outbox=outbox)
+        await outbox.join()
+        progress.status = CampaignStatus.completed
+    except asyncio.CancelledError:
+        progress.status = CampaignStatus.cancelled
+        raise
+    except Exception as e:
+        LOGGER.exception(e)
+        LOGGER.error(f"campaign {progress.campaign_uid} stopped")
+        progress.status = CampaignStatus.failed
+    finally:
+        for sender in senders:
+            sender.cancel()
+        await asyncio.gather(*senders, return_exceptions=True)
+        progress.finished_at = datetime.utcnow()
+        _campaign_tasks.pop(progress.campaign_uid, None)
+
+
+def _evict_finished():
+    now = datetime.utcnow()
+    for campaign_uid, progress in list(campaigns.items()):
+        if (
+            progress.finished_at is not None
+            and (now - progress.finished_at).total_seconds()
+            > settings.campaign_retention_seconds
+        ):
+            del campaigns[campaign_uid]
+
+
+def _is_global(admin_profile: AdminUserProfile) -> bool:
+    return admin_profile.installation == Installation.global_.value
+
+
+def _can_see(admin_profile: AdminUserProfile, progress: MailCampaignProgress) -> bool:
+    return _is_global(admin_profile) or progress.admin_uid == admin_profile.admin_uid
+
+
+async def start_campaign(
+    campaign: MailCampaign, admin_profile: AdminUserProfile
+) -> MailCampaignProgress:
+    if (
+        not _is_global(admin_profile)
+        and campaign.segment.installation != admin_profile.installation
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="campaigns can only target your own installation",
+        )
+
+    try:
+        mail_queue.template_environment().get_template(campaign.template)
+    except TemplateNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"unknown mail template {campaign.template}",
+        )
+
+    progress = MailCampaignProgress(
+        campaign_uid=uuid4(),
+        admin_uid=admin_profile.admin_uid,
+        subject=campaign.subject,
+        segment=campaign.segment,
+        started_at=datetime.utcnow(),
+    )
+    _evict_finished()
+    campaigns[progress.campaign_uid] = progress
+    _campaign_tasks[progress.campaign_uid] = asyncio.create_task(
+        _run_campaign(campaign=campaign, progress=progress)
+    )
+    return progress
+
+
+def get_campaign(
+    campaign_uid: UUID, admin_profile: AdminUserProfile
+) -> MailCampaignProgress:
+    _evict_finished()
+    progress = campaigns.get(campaign_uid)
+    # other admins' campaigns are reported as missing, not forbidden
+    if progress is None or not _can_see(admin_profile, progress):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="campaign not found"
+        )
+    return progress
+
+
+def list_campaigns(admin_profile: AdminUserProfile) -> list[MailCampaignProgress]:
+    _evict_finished()
+    return sorted(
+        (
+            progress
+            for progress in campaigns.values()
+            if _can_see(admin_profile, progress)
+        ),
+        key=lambda x: x.started_at,
+        reverse=True,
+    )
+
+
+async def cancel_campaign(
+    campaign_uid: UUID, admin_profile: AdminUserProfile
+) -> MailCampaignProgress:
+    progress = get_campaign(campaign_uid=campaign_uid, admin_profile=admin_profile)
+    await _cancel(campaign_uid=campaign_uid)
+    return progress
+
+
+async def _cancel(campaign_uid: UUID):
+    task = _campaign_tasks.get(campaign_uid)
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def stop():
+    for campaign_uid in list(_campaign_tasks):
+        await _cancel(campaign_uid=campaign_uid)
+    render_executor.shutdown(cancel_futures=True)
@@ -1,5 +1,6 @@
 from checkin.schemas.commons_schemas import Installation
 from checkin.schemas.member_schemas import (
+    AdminMemberStatistics,
     AttendanceProfile,
     Member,
     MemberExtendedProfile,
@@ -9,6 +10,9 @@ from checkin.schemas.member_schemas import (
     AttendanceUpdate,
 )
 from uuid import UUID
+from checkin.root.database import run_after_commit, session_scope
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 import checkin.database.db_handlers.member_db_handler as member_db_handler
 import logging
 from fastapi import HTTPException, status
@@ -20,42 +24,63 @@ from checkin.services.service_utils.exception_collection import (
     UpdateError,
 )
 import checkin.services.service_utils.attendance_utils as attendance_utils
+import checkin.services.service_utils.pagination_utils as pagination_utils
+import checkin.services.service_utils.gr_redis_utils as redis_utils
+from collections import Counter
 from datetime import date
+from redis import RedisError
 
 LOGGER = logging.getLogger(__file__)
 
+# per-process dashboard cache hits and misses
+DASHBOARD_CACHE_COUNTER = Counter(hits=0, misses=0)
 
-async def create_first_time_member(new_member: NewMember, installation: Installation):
-    try:
-        await _get_member(
-            first_name=new_member.first_name, last_name=new_member.last_name
-        )
-        raise HTTPException(**service_utils.ErrorEnum.member_found())
-    except NotFound:
-        try:
-            member_profile = await member_db_handler.create_new_member(
-                new_member=new_member, installation=installation
-            )
 
-            # create attendance
-            attendance_profile = await create_attendance_record(
-                member_uid=member_profile.member_uid,
-                installation=member_profile.installation,
-                member_installation=member_profile.installation,
-            )
-            return await __condinational_attendance_update(
-                attendance_profile=attendance_profile, member_profile=member_profile
+async def create_first_time_member(
+    new_member: NewMember, installation: Installation, session: AsyncSession = None
+):
+    async with session_scope(session) as session:
+        try:
+            await _get_member(
+                first_name=new_member.first_name,
+                last_name=new_member.last_name,
+                session=session,
             )
-        except DuplicateError as e:
-            LOGGER.exception(e)
-            LOGGER.error("agent duplicate found")
             raise HTTPException(**service_utils.ErrorEnum.member_found())
+        except NotFound:
+            try:
+                member_profile = await member_db_handler.create_new_member(
+                    new_member=new_member, installation=installation, session=session
+                )
+
+                # create attendance
+                attendance_profile = await create_attendance_record(
+                    member_uid=member_profile.member_uid,
+                    installation=member_profile.installation,
+                    member_installation=member_profile.installation,
+                    session=session,
+                )
+                await __count_dashboard_statistics(
+                    installation=member_profile.installation,
+                    attendance_profile=attendance_profile,
+                    session=session,
+                    total_number_members=1,
+                    total_number_first_timers=1,
+                )
+                return await __condinational_attendance_update(
+                    attendance_profile=attendance_profile,
+                    member_profile=member_profile,
+                )
+            except DuplicateError as e:
+                LOGGER.exception(e)
+                LOGGER.error("agent duplicate found")
+                raise HTTPException(**service_utils.ErrorEnum.member_found())
 
 
 async def _get_member(first_name: str, last_name: str, **kwargs):
     try:
         return await member_db_handler.get_member_via_names(
-            last_name=last_name, first_name=first_name
+            last_name=last_name, first_name=first_name, session=kwargs.get("session")
         )
     except NotFound:
         logging.error(
@@ -64,24 +89,32 @@ async def _get_member(first_name: str, last_name: str, **kwargs):
         raise NotFound
 
 
+async def search_members(
+    query: str,
+    installation: Installation,
+    limit: int = 10,
+    session: AsyncSession = None,
+):
+    return await member_db_handler.search_members(
+        query=query, installation=installation, limit=limit, session=session
+    )
+
+
 async def member_checkin_via_checkin_token(
-    checkin_token: str, installation: Installation
+    checkin_token: str, installation: Installation, session: AsyncSession = None
 ):
     try:
-        member_profile = await member_db_handler.get_member_via_checkin_token(
-            checkin_token=checkin_token
-        )
-
-        await __update_to_member_status(member_profile=member_profile)
+        # one session and one transaction for the whole check-in
+        async with session_scope(session) as session:
+            member_profile = await member_db_handler.get_member_via_checkin_token(
+                checkin_token=checkin_token, session=session
+            )
 
-        attendance_profile = await create_attendance_record(
-            member_uid=member_profile.member_uid,
-            member_installation=member_profile.installation,
-            installation=installation,
-        )
-        return await __condinational_attendance_update(
-            attendance_profile=attendance_profile, member_profile=member_profile
-        )
+            return await __checkin(
+                member_profile=member_profile,
+                installation=installation,
+                session=session,
+            )
     except NotFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -89,9 +122,13 @@ async def member_checkin_via_checkin_token(
         )
 
 
-async def __get_member_via_names(first_name: str, last_name: str):
+async def __get_member_via_names(
+    first_name: str, last_name: str, session: AsyncSession = None
+):
     try:
-        return await _get_member(first_name=first_name, last_name=last_name)
+        return await _get_member(
+            first_name=first_name, last_name=last_name, session=session
+        )
     except NotFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,101 +136,100 @@ async def __get_member_via_names(first_name: str, last_name: str):
         )
 
 
-async def __update_to_member_status(member_profile: MemberExtendedProfile):
-    if len(member_profile.attendance) >= 4:
+async def __update_to_member_status(
+    member_profile: MemberExtendedProfile, session: AsyncSession = None
+):
+    if member_profile.is_first_time and len(member_profile.attendance) >= 4:
         await member_db_handler.update_member(
             member_uid=member_profile.member_uid,
             member_update=MemberUpdate(is_first_time=False),
+            session=session,
+        )
+        member_profile.is_first_time = False
+        await __invalidate_dashboard_statistics(
+            installation=member_profile.installation, session=session
         )
 
 
 async def __condinational_attendance_update(
     attendance_profile: AttendanceProfile, member_profile: MemberExtendedProfile
 ):
-    if len(member_profile.attendance) == 0:
-        member_profile.attendance.append(attendance_profile)
-
-    elif attendance_profile.uid != member_profile.attendance[-1].uid:
+    if attendance_profile.uid not in {x.uid for x in member_profile.attendance}:
         member_profile.attendance.append(attendance_profile)
 
     return member_profile
 
 
-async def member_checkin(member: Member, installation: Installation):
-    member_profile = await __get_member_via_names(
-        first_name=member.first_name, last_name=member.last_name
-    )
-
-    await __update_to_member_status(member_profile=member_profile)
+async def __checkin(
+    member_profile: MemberExtendedProfile,
+    installation: Installation,
+    session: AsyncSession,
+):
+    await __update_to_member_status(member_profile=member_profile, session=session)
     attendance_profile = await create_attendance_record(
         member_uid=member_profile.member_uid,
         member_installation=member_profile.installation,
         installation=installation,
+        session=session,
     )
+    # a re-scan returns the attendance already counted
+    if attendance_profile.uid not in {x.uid for x in member_profile.attendance}:
+        await __count_dashboard_statistics(
+            installation=member_profile.installation,
+            attendance_profile=attendance_profile,
+            session=session,
+        )
     return await __condinational_attendance_update(
         attendance_profile=attendance_profile, member_profile=member_profile
     )
 
 
-async def create_attendance_record(
-    member_uid: UUID, member_installation: Installation, installation: Installation
+async def member_checkin(
+    member: Member, installation: Installation, session: AsyncSession = None
 ):
-    no_attendance = True
-    today = attendance_utils.today()
-
-    # check if record for today exist before creating a new record
-    try:
-        todays_attendance = await get_todays_attendance(
-            member_uid=member_uid, date_=today
+    # one session and one transaction for the whole check-in
+    async with session_scope(session) as session:
+        member_profile = await __get_member_via_names(
+            first_name=member.first_name, last_name=member.last_name, session=session
         )
 
-        if member_installation != installation.value:
-            no_attendance = False
-
-            raise HTTPException(status_code=400, detail="")
-
-        no_record = 0
-        for attendance in todays_attendance:
-            if attendance.guest_installation is None:
-                no_record += 1
-        if no_record == 0:
-            raise HTTPException(status_code=400, detail="")
-
-        return todays_attendance[-1]
-
-    except HTTPException:
-
-        if member_installation != installation.value and no_attendance is False:
-
-            for attendance in todays_attendance:
-                print(attendance)
-                if attendance.guest_installation == installation:
-                    return attendance
-        print("here")
+        return await __checkin(
+            member_profile=member_profile, installation=installation, session=session
+        )
 
-        is_guest = True
-        guest_installation = installation
-        if member_installation == installation:
-            is_guest = False
-            guest_installation = None
 
-        attendence = Attendance(
-            member_uid=member_uid,
-            is_guest=is_guest,
-            date=today,
-            sunday_service=attendance_utils.is_sunday(),
-            midweek_service=not attendance_utils.is_sunday(),
-            guest_installation=guest_installation,
-            global_gethsemane=attendance_utils.is_tuesday(),
-        )
+async def create_attendance_record(
+    member_uid: UUID,
+    member_installation: Installation,
+    installation: Installation,
+    session: AsyncSession = None,
+):
+    # a member checking in away from home is recorded as a guest of that installation
+    is_guest = member_installation != installation
+    guest_installation = installation if is_guest else None
+
+    attendence = Attendance(
+        member_uid=member_uid,
+        is_guest=is_guest,
+        date=attendance_utils.today(),
+        sunday_service=attendance_utils.is_sunday(),
+        midweek_service=not attendance_utils.is_sunday(),
+        guest_installation=guest_installation,
+        global_gethsemane=attendance_utils.is_tuesday(),
+    )
 
-        return await member_db_handler.create_attendance_record(attendance=attendence)
+    # idempotent: returns today's existing record for this installation if any
+    return await member_db_handler.create_attendance_record(
+        attendance=attendence, session=session
+    )
 
 
-async def get_todays_attendance(member_uid: UUID, date_: date):
+async def get_todays_attendance(
+    member_uid: UUID, date_: date, session: AsyncSession = None
+):
     try:
         return await member_db_handler.get_todays_attendance(
-            member_uid=member_uid, date_=date_
+            member_uid=member_uid, date_=date_, session=session
         )
     except NotFound:
         raise HTTPException(
@@ -202,10 +238,12 @@ async def get_todays_attendance(member_uid: UUID, date_: date):
         )
 
 
-async def get_attendance_via_uid(attendance_uid: UUID) -> AttendanceProfile:
+async def get_attendance_via_uid(
+    attendance_uid: UUID, session: AsyncSession = None
+) -> AttendanceProfile:
     try:
         return await member_db_handler.get_member_attendance_record_via_uid(
-            attendance_uid=attendance_uid
+            uid=attendance_uid, session=session
         )
 
     except NotFound:
@@ -216,28 +254,34 @@ async def get_attendance_via_uid(attendance_uid: UUID) -> AttendanceProfile:
 
 
 async def update_attendance_via_uid(
-    attendance_uid: UUID, attendance_update: AttendanceUpdate
+    attendance_uid: UUID,
+    attendance_update: AttendanceUpdate,
+    session: AsyncSession = None,
 ):
-    try:
-        attendance_profile = await get_attendance_via_uid(attendance_uid=attendance_uid)
+    async with session_scope(session) as session:
+        try:
+            attendance_profile = await get_attendance_via_uid(
+                attendance_uid=attendance_uid, session=session
+            )
 
-        return await member_db_handler.update_member_attendance_record(
-            member_uid=attendance_profile.member_uid,
-            uid=attendance_uid,
-            attendance_update=attendance_update,
-        )
+            return await member_db_handler.update_member_attendance_record(
+                member_uid=attendance_profile.member_uid,
+                uid=attendance_uid,
+                attendance_update=attendance_update,
+                session=session,
+            )
 
-    except UpdateError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="attendance updated failed",
-        )
+        except UpdateError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="attendance updated failed",
+            )
 
 
-async def delete_attendance_via_uid(attendance_uid: UUID):
+async def delete_attendance_via_uid(attendance_uid: UUID, session: AsyncSession = None):
     try:
-        return await member_db_handler.delete_member_attendance_record(
-            attendance_uid=attendance_uid
+        return await member_db_handler.delete_attendance_record(
+            uid=attendance_uid, session=session
         )
     except DeleteError:
         raise HTTPException(
@@ -250,14 +294,28 @@ async def delete_attendance_via_uid(attendance_uid: UUID):
 
 
 async def get_members(installation: Installation, **kwargs):
+    cursor = kwargs.pop("cursor", None)
+    if cursor is not None:
+        try:
+            kwargs["cursor"] = pagination_utils.decode_cursor(cursor=cursor)
+        except ValueError as e:
+            LOGGER.exception(e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="invalid pagination cursor",
+            )
+
+    # kwargs may carry the caller's session
     return await member_db_handler.get_installation_members(
         installation=installation, **kwargs
     )
 
 
-async def get_member_via_member_uid(member_uid: UUID):
+async def get_member_via_member_uid(member_uid: UUID, session: AsyncSession = None):
     try:
-        return await member_db_handler.get_member(member_uid=member_uid)
+        return await member_db_handler.get_member(
+            member_uid=member_uid, session=session
+        )
 
     except NotFound:
         raise HTTPException(
@@ -267,50 +325,154 @@ async def get_member_via_member_uid(member_uid: UUID):
     ...
 
 
-async def update_member(member_uid: UUID, member_update: MemberUpdate):
-    await get_member_via_member_uid(member_uid=member_uid)
-    try:
-        await member_db_handler.update_member(
-            member_uid=member_uid, member_update=member_update
+async def update_member(
+    member_uid: UUID, member_update: MemberUpdate, session: AsyncSession = None
+):
+    async with session_scope(session) as session:
+        member_profile = await get_member_via_member_uid(
+            member_uid=member_uid, session=session
         )
-        return await get_member_via_member_uid(member_uid=member_uid)
+        try:
+            await member_db_handler.update_member(
+                member_uid=member_uid, member_update=member_update, session=session
+            )
+            await __invalidate_dashboard_statistics(
+                installation=member_profile.installation, session=session
+            )
+            return await get_member_via_member_uid(
+                member_uid=member_uid, session=session
+            )
 
-    except UpdateError as e:
-        LOGGER.exception(e)
-        LOGGER.error(
-            f"update for member_uid: {member_uid}, with payload: {member_update.model_dump()}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"member with uid: {member_uid} failed to update",
+        except UpdateError as e:
+            LOGGER.exception(e)
+            LOGGER.error(
+                f"update for member_uid: {member_uid}, with payload: {member_update.model_dump()}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"member with uid: {member_uid} failed to update",
+            )
+        ...
+
+
+async def delete_member(member_uid: UUID, session: AsyncSession = None):
+    async with session_scope(session) as session:
+        member_profile = await get_member_via_member_uid(
+            member_uid=member_uid, session=session
         )
-    ...
 
+        try:
+            # trigger the job to Client Side
+            await member_db_handler.delete_member(
+                member_uid=member_uid, session=session
+            )
+            await __invalidate_dashboard_statistics(
+                installation=member_profile.installation, session=session
+            )
 
-async def delete_member(member_uid: UUID):
-    await get_member_via_member_uid(member_uid=member_uid)
+            return {}
+        except DeleteError as e:
+            LOGGER.exception(e)
+            LOGGER.error(f"delete for member: {member_uid} failed")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"member with uid: {member_uid} failed to delete",
+            )
 
-    try:
-        # trigger the job to Client Side
-        await member_db_handler.delete_member(member_uid=member_uid)
 
-        return {}
-    except DeleteError as e:
-        LOGGER.exception(e)
-        LOGGER.error(f"delete for member: {member_uid} failed")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"member with uid: {member_uid} failed to delete",
-        )
+def __dashboard_installations(installation: Installation) -> list[str]:
+    # GLOBAL aggregates every installation, so it moves with each of them
+    return list({Installation(installation).value, Installation.global_.value})
 
 
-async def admin_dashboard_statistics(installation: Installation):
-    member_uids = None
-    if installation != Installation.global_:
-        member_profiles = await get_members(installation=installation)
+async def __after_commit(session: Optional[AsyncSession], callback):
+    # without a caller's session the write has already been committed
+    if session is None:
+        await callback()
+    else:
+        run_after_commit(session=session, callback=callback)
 
-        member_uids = [member.member_uid for member in member_profiles.result_set]
 
-    return await member_db_handler.member_attendance_statistics(
-        installation=installation, member_uids=member_uids
+async def __count_dashboard_statistics(
+    installation: Installation,
+    attendance_profile: AttendanceProfile,
+    session: AsyncSession = None,
+    **deltas,
+):
+    deltas.update(
+        total_number_on_sunday=int(attendance_profile.sunday_service),
+        total_number_global_gethsemane=int(attendance_profile.global_gethsemane),
+        total_number_local_gethsemane=int(attendance_profile.midweek_service),
     )
+
+    async def increment():
+        try:
+            await redis_utils.increment_dashboard_statistics(
+                installations=__dashboard_installations(installation=installation),
+                deltas=deltas,
+            )
+        except RedisError as e:
+            LOGGER.exception(e)
+            LOGGER.error(f"dashboard statistics for {installation} not incremented")
+
+    await __after_commit(session=session, callback=increment)
+
+
+async def __invalidate_dashboard_statistics(
+    installation: Installation, session: AsyncSession = None
+):
+    async def invalidate():
+        try:
+            await redis_utils.delete_dashboard_statistics(
+                installations=__dashboard_installations(installation=installation)
+            )
+        except RedisError as e:
+            LOGGER.exception(e)
+            LOGGER.error(f"dashboard statistics for {installation} not invalidated")
+
+    await __after_commit(session=session, callback=invalidate)
+
+
+async def admin_dashboard_statistics(
+    installation: Installation, session: AsyncSession = None
+):
+    installation = Installation(installation).value
+
+    redis_available = True
+    try:
+        cached_statistics = await redis_utils.get_dashboard_statistics(
+            installation=installation
+        )
+    except RedisError as e:
+        # the aggregate is one statement; serve it straight from Postgres
+        LOGGER.exception(e)
+        LOGGER.error(f"dashboard statistics cache for {installation} unavailable")
+        redis_available, cached_statistics = False, None
+
+    if cached_statistics:
+        DASHBOARD_CACHE_COUNTER["hits"] += 1
+        return AdminMemberStatistics(**cached_statistics)
+
+    DASHBOARD_CACHE_COUNTER["misses"] += 1
+    statistics = await member_db_handler.member_attendance_statistics(
+        installation=installation, session=session
+    )
+    if not redis_available:
+        return statistics
+
+    try:
+        await redis_utils.add_dashboard_statistics(
+            installation=installation, statistics=statistics.model_dump()
+        )
+    except RedisError as e:
+        LOGGER.exception(e)
+        LOGGER.error(f"dashboard statistics for {installation} not cached")
+    return statistics
+
+
+def dashboard_cache_statistics():
+    lookups = DASHBOARD_CACHE_COUNTER["hits"] + DASHBOARD_CACHE_COUNTER["misses"]
+    return {
+        **DASHBOARD_CACHE_COUNTER,
+        "hit_rate": DASHBOARD_CACHE_COUNTER["hits"] / lookups if lookups else 0.0,
+    }
@@ -20,6 +20,11 @@ class ErrorEnum(Enum):
         detail="invalid email or password credential",
     )
 
+    mail_queue_full = payload_builder(
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="too many pending mails, retry shortly",
+    )
+
     redis_not_found = payload_builder(
         status=status.HTTP_400_BAD_REQUEST, detail="token expired or not valid"
     )
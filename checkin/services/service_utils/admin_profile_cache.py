@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from uuid import UUID
+
+from redis import RedisError
+
+import checkin.services.service_utils.auth_utils as auth_utils
+import checkin.services.service_utils.gr_redis_utils as redis_utils
+from checkin.root.settings import Settings
+from checkin.root.utils.ttl_cache import TTLCache
+from checkin.schemas.auth_schemas import AdminUserProfile
+
+LOGGER = logging.getLogger(__name__)
+
+settings = Settings()
+
+# Two tier cache of admin profiles: per-process entries in front of a shared
+# Redis copy. Writers invalidate by admin_uid over pub/sub; while that feed is
+# down the local tier is bypassed, and lookups that miss both tiers fall back to
+# Postgres in admin_service.
+admin_profiles = TTLCache(maxsize=settings.admin_cache_max_size)
+admin_uids_by_email = TTLCache(maxsize=settings.admin_cache_max_size)
+ADMIN_CACHE_STATS = {
+    "ready": False,
+    "local_hits": 0,
+    "redis_hits": 0,
+    "misses": 0,
+    "invalidations": 0,
+}
+
+_tasks: list[asyncio.Task] = []
+
+
+def admin_cache_statistics():
+    return {
+        **ADMIN_CACHE_STATS,
+        "local_entries": len(admin_profiles),
+    }
+
+
+def _dump(admin_profile: AdminUserProfile) -> str:
+    # email is excluded from the profile's own serialisation; so is the password,
+    # which stays out of the cache
+    return json.dumps(
+        {**admin_profile.model_dump(mode="json"), "email": admin_profile.email}
+    )
+
+
+def _remember(admin_profile: AdminUserProfile):
+    if not ADMIN_CACHE_STATS["ready"]:
+        return
+
+    admin_profiles.set(
+        key=admin_profile.admin_uid, value=admin_profile, ttl=settings.admin_cache_ttl
+    )
+    admin_uids_by_email.set(
+        key=admin_profile.email,
+        value=admin_profile.admin_uid,
+        ttl=settings.admin_cache_ttl,
+    )
+
+
+def _forget(admin_uid: UUID):
+    ADMIN_CACHE_STATS["invalidations"] += 1
+    admin_profiles.pop(key=admin_uid)
+    auth_utils.forget_admin_verified_tokens(admin_uid=admin_uid)
+
+
+def _forget_all():
+    admin_profiles.clear()
+    admin_uids_by_email.clear()
+    auth_utils.verified_token_cache.clear()
+
+
+async def get_admin_profile(admin_uid: UUID) -> Optional[AdminUserProfile]:
+    if ADMIN_CACHE_STATS["ready"]:
+        admin_profile = admin_profiles.get(key=admin_uid)
+        if admin_profile is not None:
+            ADMIN_CACHE_STATS["local_hits"] += 1
+            return admin_profile
+
+    try:
+        data = await redis_utils.get_admin_profile(admin_uid=str(admin_uid))
+    except RedisError as e:
+        LOGGER.exception(e)
+        LOGGER.error("admin profile cache unavailable")
+        return None
+
+    if data is None:
+        ADMIN_CACHE_STATS["misses"] += 1
+        return None
+
+    ADMIN_CACHE_STATS["redis_hits"] += 1
+    admin_profile = AdminUserProfile(**json.loads(data))
+    _remember(admin_profile=admin_profile)
+    return admin_profile
+
+
+async def get_admin_profile_by_email(email: str) -> Optional[AdminUserProfile]:
+    admin_uid = None
+    if ADMIN_CACHE_STATS["ready"]:
+        admin_uid = admin_uids_by_email.get(key=email)
+
+    if admin_uid is None:
+        try:
+            admin_uid = await redis_utils.get_admin_uid_by_email(email=email)
+        except RedisError as e:
+            LOGGER.exception(e)
+            LOGGER.error("admin profile cache unavailable")
+            return None
+
+        if admin_uid is None:
+            ADMIN_CACHE_STATS["misses"] += 1
+            return None
+        admin_uid = UUID(admin_uid)
+
+    admin_profile = await get_admin_profile(admin_uid=admin_uid)
+    # the email pointer outlives an email change; the profile is the authority
+    if admin_profile is None or admin_profile.email != email:
+        return None
+    return admin_profile
+
+
+async def cache_admin_profile(admin_profile: AdminUserProfile):
+    """Cache the profile without its password hash.
+
+    Logins and password changes read the hash from Postgres, so a copy cached
+    from before a password reset cannot keep the old password working.
+    """
+    admin_profile = admin_profile.model_copy(update={"password": None})
+    _remember(admin_profile=admin_profile)
+    try:
+        await redis_utils.add_admin_profile(
+            admin_uid=str(admin_profile.admin_uid),
+            email=admin_profile.email,
+            profile=_dump(admin_profile=admin_profile),
+        )
+    except RedisError as e:
+        LOGGER.exception(e)
+        LOGGER.error("admin profile cache write failed")
+
+
+async def invalidate_admin_profile(admin_uid: UUID):
+    _forget(admin_uid=admin_uid)
+    try:
+        await redis_utils.invalidate_admin_profile(admin_uid=str(admin_uid))
+    except RedisError as e:
+        LOGGER.exception(e)
+        LOGGER.error(
+            f"admin profile invalidation failed, stale for up to "
+            f"{redis_utils.ADMIN_PROFILE_EXPIRE}s: {admin_uid}"
+        )
+
+
+async def _follow_invalidations():
+    try:
+        while True:
+            pubsub = redis_utils.admin_profile_pubsub()
+            try:
+                await pubsub.subscribe(redis_utils.ADMIN_PROFILE_CHANNEL)
+                ADMIN_CACHE_STATS["ready"] = True
+                async for message in pubsub.listen():
+                    # one bad payload must not stop the feed while `ready` stays set
+                    try:
+                        _forget(admin_uid=UUID(message["data"]))
+                    except (ValueError, KeyError, TypeError) as e:
+                        LOGGER.exception(e)
+                        LOGGER.error(
+                            f"malformed admin profile invalidation: {message['data']!r}"
+                        )
+            except (RedisError, OSError) as e:
+                # invalidations may be missed from here on, so trust nothing local
+                ADMIN_CACHE_STATS["ready"] = False
+                _forget_all()
+                LOGGER.exception(e)
+                LOGGER.error("admin profile invalidation feed lost, reading Redis")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+    finally:
+        # nothing evicts local entries once the feed stops, however it stopped
+        ADMIN_CACHE_STATS["ready"] = False
+        _forget_all()
+
+
+async def start():
+    _tasks.append(asyncio.create_task(_follow_invalidations()))
+
+
+async def stop():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -1,16 +1,29 @@
 from passlib.context import CryptContext
 from checkin.root.settings import Settings
 from itsdangerous import URLSafeTimedSerializer, BadTimeSignature, BadSignature
+import asyncio
 import logging
+import hashlib
+import hmac
+import struct
+import math
+import secrets
+import time
 from jose import ExpiredSignatureError, jwt, JWTError
+from concurrent.futures import ThreadPoolExecutor
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import timedelta, datetime
 from fastapi import HTTPException, status
-from checkin.schemas.auth_schemas import TokenData
+from checkin.schemas.auth_schemas import AdminUserProfile, TokenData
+from checkin.root.utils.ttl_cache import TTLCache
 import checkin.services.service_utils.gr_redis_utils as redis_utils
+import checkin.services.service_utils.revocation_filter as revocation_filter
+import checkin.root.metrics as metrics
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends
 import checkin.services.admin_service as admin_service
 from uuid import UUID
+from typing import Optional
 import checkin.services.service_error_enums as service_error
 
 
@@ -19,15 +32,86 @@ LOGGER = logging.getLogger(__name__)
 settings = Settings()
 
 # PASSWORD HASHING AND VALIDATOR
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min = max = default: hashes at any other cost are flagged by verify_and_update,
+# so stored hashes follow BCRYPT_ROUNDS up or down (see bin/calibrate_bcrypt.py)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps ~250ms hashes off the
+# event loop; jobs beyond the queue bound are refused instead of piling up
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+PASSWORD_HASH_STATS = {
+    "in_flight": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "queue_wait_seconds_total": 0.0,
+    "queue_wait_seconds_max": 0.0,
+}
+
+
+async def _run_password_job(job, *args):
+    if PASSWORD_HASH_STATS["in_flight"] >= settings.password_hash_max_pending:
+        PASSWORD_HASH_STATS["rejected"] += 1
+        metrics.PASSWORD_HASH_REJECTED.inc()
+        LOGGER.error("password hashing queue is full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="too many concurrent sign-ins, retry shortly",
+        )
+
+    queued_at = time.perf_counter()
+
+    def timed_job():
+        queue_wait = time.perf_counter() - queued_at
+        PASSWORD_HASH_STATS["queue_wait_seconds_total"] += queue_wait
+        PASSWORD_HASH_STATS["queue_wait_seconds_max"] = max(
+            PASSWORD_HASH_STATS["queue_wait_seconds_max"], queue_wait
+        )
+        metrics.PASSWORD_HASH_QUEUE_WAIT.observe(queue_wait)
+        return job(*args)
+
+    PASSWORD_HASH_STATS["in_flight"] += 1
+    metrics.PASSWORD_HASH_IN_FLIGHT.set(PASSWORD_HASH_STATS["in_flight"])
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            password_executor, timed_job
+        )
+    except Exception:
+        PASSWORD_HASH_STATS["failed"] += 1
+        metrics.PASSWORD_HASH_JOBS.inc(outcome="failed")
+        raise
+    finally:
+        PASSWORD_HASH_STATS["in_flight"] -= 1
+        metrics.PASSWORD_HASH_IN_FLIGHT.set(PASSWORD_HASH_STATS["in_flight"])
+
+    PASSWORD_HASH_STATS["completed"] += 1
+    metrics.PASSWORD_HASH_JOBS.inc(outcome="completed")
+    return result
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(pwd_context.verify, plain_password, hashed_password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """(password matches, replacement hash if the stored one uses another cost)"""
+    return await _run_password_job(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
 
 
-def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+async def hash_password(plain_password: str) -> str:
+    return await _run_password_job(pwd_context.hash, plain_password)
 
 
 # AUTHENTICATION
@@ -58,9 +142,81 @@ def resolve_token(signed_token: str, max_age: int):
         raise Exception
 
 
+def new_token_id() -> str:
+    return secrets.token_urlsafe(12)
+
+
+def token_id(token: str, payload: dict) -> str:
+    # tokens issued before jti existed are identified by a digest of the token
+    return payload.get("jti") or token_digest(token=token)[:16]
+
+
+# COMPACT ACCESS TOKEN
+# c1.<payload>.<mac>: admin_uid, exp and jti packed into 29 bytes under a single
+# HMAC-SHA256, instead of a JWT wrapped again by the top level signer. The MAC key
+# is derived from the access JWT secret, so it stays apart from the refresh and
+# signer keys.
+COMPACT_TOKEN_PREFIX = "c1."
+COMPACT_TOKEN_KEY = hmac.new(
+    key=SECRET_KEY.encode(), msg=b"compact-access-token", digestmod=hashlib.sha256
+).digest()
+# same effective lifetime as the signed JWT, whose signer max_age is in seconds
+COMPACT_ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES
+_compact_payload = struct.Struct(">16sI9s")
+
+
+def _b64encode(raw: bytes) -> str:
+    return urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(encoded: str) -> bytes:
+    return urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+
+
+def _compact_mac(payload: str) -> bytes:
+    return hmac.new(
+        key=COMPACT_TOKEN_KEY, msg=payload.encode(), digestmod=hashlib.sha256
+    ).digest()
+
+
+def create_compact_access_token(admin_uid: str) -> str:
+    exp = int(time.time()) + COMPACT_ACCESS_TOKEN_EXPIRE_SECONDS
+    payload = _b64encode(
+        _compact_payload.pack(UUID(admin_uid).bytes, exp, secrets.token_bytes(9))
+    )
+    return f"{COMPACT_TOKEN_PREFIX}{payload}.{_b64encode(_compact_mac(payload))}"
+
+
+def decode_compact_access_token(token: str) -> dict:
+    """Claims of a compact access token.
+
+    Raises:
+        ValueError: the token is malformed, forged or expired
+    """
+    try:
+        payload, mac = token.removeprefix(COMPACT_TOKEN_PREFIX).split(".")
+        if not hmac.compare_digest(_b64decode(mac), _compact_mac(payload)):
+            raise ValueError("compact token signature mismatch")
+        admin_uid, exp, jti = _compact_payload.unpack(_b64decode(payload))
+    except struct.error as e:
+        raise ValueError(e)
+
+    if exp <= time.time():
+        raise ValueError("compact token expired")
+
+    return {"admin_uid": str(UUID(bytes=admin_uid)), "exp": exp, "jti": _b64encode(jti)}
+
+
 def create_access_token(data: dict):
+    if settings.compact_access_tokens:
+        return create_compact_access_token(admin_uid=data["admin_uid"])
+
+    return create_jwt_access_token(data=data)
+
+
+def create_jwt_access_token(data: dict):
     expire = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES) + datetime.utcnow()
-    data.update({"exp": expire})
+    data.update({"exp": expire, "jti": new_token_id()})
     encoded_jwt = jwt.encode(claims=data, key=SECRET_KEY, algorithm=ALGORITHM)
     dangerous_access_token = sign_token(jwt_token=encoded_jwt)
 
@@ -69,7 +225,7 @@ def create_access_token(data: dict):
 
 def create_refresh_token(data: dict):
     expire = timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES) + datetime.utcnow()
-    data.update({"exp": expire})
+    data.update({"exp": expire, "jti": new_token_id()})
     encoded_jwt = jwt.encode(claims=data, key=REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
     # add signed_token
@@ -77,40 +233,123 @@ def create_refresh_token(data: dict):
     return dangerous_refresh_token
 
 
-async def verify_access_token(token: str):
-    cache_token = redis_utils.get_token_blacklist(token=token)
-    if cache_token:
+async def ensure_token_not_revoked(token: str, payload: dict):
+    # full-token blacklist keys from before token ids, kept until their TTL runs out
+    if "jti" not in payload and await redis_utils.get_token_blacklist(token=token):
+        raise HTTPException(detail="black-listed token", status_code=401)
+
+    revoked_token_id = token_id(token=token, payload=payload)
+    # the local filter has no false negatives, so only its hits need Redis
+    if not revocation_filter.might_be_revoked(token_id=revoked_token_id):
+        return
+
+    if await redis_utils.get_revoked_token(token_id=revoked_token_id):
         raise HTTPException(detail="black-listed token", status_code=401)
+    revocation_filter.record_false_positive()
+
+
+def _token_revocation(token: str, secret_key: str, max_age: int):
+    """(token id, seconds the token stays usable), or None for an unusable token."""
+    if token.startswith(COMPACT_TOKEN_PREFIX):
+        try:
+            payload = decode_compact_access_token(token=token)
+        except ValueError:
+            return None
+        return payload["jti"], math.ceil(payload["exp"] - time.time())
 
     try:
-        jwt_token = resolve_token(
-            signed_token=token, max_age=ACCESS_TOKEN_EXPIRE_MINUTES
+        jwt_token, signed_at = token_signer.loads(
+            s=token, max_age=max_age, return_timestamp=True
         )
-    except Exception:
+        payload = jwt.decode(token=jwt_token, key=secret_key, algorithms=[ALGORITHM])
+    except (BadSignature, JWTError):
+        return None
+
+    now = time.time()
+    lifetime_left = min(payload["exp"], signed_at.timestamp() + max_age) - now
+    return token_id(token=token, payload=payload), math.ceil(lifetime_left)
+
+
+async def revoke_tokens(access_token: str, refresh_token: str):
+    revoked_tokens = dict(
+        revocation
+        for revocation in (
+            _token_revocation(
+                token=access_token,
+                secret_key=SECRET_KEY,
+                max_age=ACCESS_TOKEN_EXPIRE_MINUTES,
+            ),
+            _token_revocation(
+                token=refresh_token,
+                secret_key=REFRESH_SECRET_KEY,
+                max_age=REFRESH_TOKEN_EXPIRE_MINUTES,
+            ),
+        )
+        if revocation is not None
+    )
+    await redis_utils.add_revoked_tokens(revoked_tokens=revoked_tokens)
+    revocation_filter.add_revoked_token_ids(token_ids=list(revoked_tokens))
+    forget_verified_token(token=access_token)
+
+
+def decode_access_token(token: str) -> dict:
+    # both formats are accepted while compact tokens roll out
+    if token.startswith(COMPACT_TOKEN_PREFIX):
+        try:
+            return decode_compact_access_token(token=token)
+        except ValueError as e:
+            LOGGER.error(f"compact access_token rejected: {e}")
+            raise credentials_exception()
+
+    try:
+        jwt_token, signed_at = token_signer.loads(
+            s=token, max_age=ACCESS_TOKEN_EXPIRE_MINUTES, return_timestamp=True
+        )
+    except (BadTimeSignature, BadSignature) as e:
+        LOGGER.exception(e)
         LOGGER.error("Access_token top level signer decrypt failed")
         raise credentials_exception()
 
     try:
         payload = jwt.decode(token=jwt_token, key=SECRET_KEY, algorithms=[ALGORITHM])
+    except (JWTError, ExpiredSignatureError) as e:
+        LOGGER.exception(e)
+        LOGGER.error("JWT Decryption Error")
+        raise credentials_exception()
+
+    # the signer's max_age is in seconds, so it lapses long before the JWT exp;
+    # report whichever comes first, as _token_revocation does
+    payload["exp"] = math.floor(
+        min(payload["exp"], signed_at.timestamp() + ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return payload
+
 
+async def verify_access_token(token: str):
+    payload = decode_access_token(token=token)
+
+    try:
         id: str = payload.get("admin_uid")
         if id is None:
             LOGGER.error(f"Decrypted JWT has not id in payload. {payload}")
             raise credentials_exception()
 
-        token_data = TokenData(admin_uid=UUID(id))
-    except (JWTError, ExpiredSignatureError) as e:
+        token_data = TokenData(
+            admin_uid=UUID(id),
+            exp=payload.get("exp"),
+            token_id=token_id(token=token, payload=payload),
+        )
+    except ValueError as e:
         LOGGER.exception(e)
-        LOGGER.error("JWT Decryption Error")
+        LOGGER.error("access_token has an invalid admin_uid")
         raise credentials_exception()
 
+    await ensure_token_not_revoked(token=token, payload=payload)
+
     return token_data
 
 
 async def verify_refresh_token(token: str):
-    cache_token = redis_utils.get_token_blacklist(token=token)
-    if cache_token:
-        raise HTTPException(detail="black-listed token", status_code=401)
     try:
         jwt_token = resolve_token(
             signed_token=token, max_age=REFRESH_TOKEN_EXPIRE_MINUTES
@@ -133,6 +372,8 @@ async def verify_refresh_token(token: str):
         LOGGER.exception(e)
         raise credentials_exception()
 
+    await ensure_token_not_revoked(token=token, payload=payload)
+
     return token_data
 
 
@@ -152,13 +393,61 @@ def credentials_exception():
     )
 
 
+# VERIFIED TOKEN CACHE
+verified_token_cache = TTLCache(maxsize=settings.token_cache_max_size)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def cache_verified_token(
+    token: str, admin_profile: AdminUserProfile, exp: int, revoked_token_id: str
+):
+    # never outlive the token itself; `exp` is when it actually stops verifying
+    ttl = settings.token_cache_ttl
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+
+    verified_token_cache.set(
+        key=token_digest(token=token), value=(admin_profile, revoked_token_id), ttl=ttl
+    )
+
+
+def forget_verified_token(token: str):
+    verified_token_cache.pop(key=token_digest(token=token))
+
+
+def forget_admin_verified_tokens(admin_uid: UUID):
+    verified_token_cache.pop_where(
+        predicate=lambda entry: entry[0].admin_uid == admin_uid
+    )
+
+
 async def get_current_user(
     auth_credential: HTTPAuthorizationCredentials = Depends(bearer),
 ):
     if not auth_credential.credentials:
         credentials_exception()
 
+    cached = verified_token_cache.get(
+        key=token_digest(token=auth_credential.credentials)
+    )
+    if cached is not None:
+        user, revoked_token_id = cached
+        # a logout on another worker only reaches this one through the filter;
+        # filter hits (and an unsynced filter) go back through full verification
+        if not revocation_filter.might_be_revoked(token_id=revoked_token_id):
+            return user
+        forget_verified_token(token=auth_credential.credentials)
+
     token = await verify_access_token(token=auth_credential.credentials)
 
     user = await admin_service.get_admin_user(admin_uid=token.admin_uid)
+    cache_verified_token(
+        token=auth_credential.credentials,
+        admin_profile=user,
+        exp=token.exp,
+        revoked_token_id=token.token_id,
+    )
     return user
@@ -1,40 +1,202 @@
+from checkin.root.metrics import timed_redis
 from checkin.root.redis_manager import gr_redis
+import json
+import time
 
 
 FORGET_PASSWORD_EXPIRE = 120
+DASHBOARD_STATISTICS_EXPIRE = 30
+REVOKED_TOKENS_CHANNEL = "revoked-tokens"
+ADMIN_PROFILE_EXPIRE = 5 * 60
+ADMIN_PROFILE_CHANNEL = "admin-profile-invalidations"
 
 
 def forget_admin_key_generator(token: int):
     return f"Forget-Admin-Key-{token}"
 
 
-def add_forget_admin_token(token: int, email: str):
+@timed_redis
+async def add_forget_admin_token(token: int, email: str):
     key = forget_admin_key_generator(token=token)
 
-    return gr_redis.set(name=key, value=email, ex=FORGET_PASSWORD_EXPIRE)
+    return await gr_redis.set(name=key, value=email, ex=FORGET_PASSWORD_EXPIRE)
 
 
-def get_forget_admin_token(token: int):
+@timed_redis
+async def get_forget_admin_token(token: int):
     key = forget_admin_key_generator(token=token)
 
-    return gr_redis.get(name=key)
+    return await gr_redis.get(name=key)
 
 
-def delete_forget_admin_token(token: int):
+@timed_redis
+async def delete_forget_admin_token(token: int):
     key = forget_admin_key_generator(token=token)
-    return gr_redis.delete(key)
+    return await gr_redis.delete(key)
 
 
 def black_list_bearer_tokens(access_token: str):
     return f"black-list-token-{access_token}"
 
 
-def add_token_blacklist(access_token: str, refresh_token: str):
-    for token in [access_token, refresh_token]:
-        key = black_list_bearer_tokens(access_token=token)
-        gr_redis.set(name=key, value=token, ex=60 * 60 * 24)
+@timed_redis
+async def get_token_blacklist(token: str):
+    # legacy full-token keys; new revocations go through add_revoked_tokens
+    key = black_list_bearer_tokens(access_token=token)
+    return await gr_redis.get(name=key)
 
 
-def get_token_blacklist(token: str):
-    key = black_list_bearer_tokens(access_token=token)
-    return gr_redis.get(name=key)
+def revoked_token_key(token_id: str):
+    return f"revoked-{token_id}"
+
+
+@timed_redis
+async def add_revoked_tokens(revoked_tokens: dict[str, int]):
+    """Revoke token ids, each for as many seconds as the token stays usable.
+
+    The ids are also published so every worker can add them to its local filter.
+    """
+    token_ids = [
+        token_id
+        for token_id, lifetime_left in revoked_tokens.items()
+        if lifetime_left > 0
+    ]
+    if not token_ids:
+        return []
+
+    async with gr_redis.pipeline(transaction=False) as pipeline:
+        for token_id in token_ids:
+            pipeline.set(
+                name=revoked_token_key(token_id=token_id),
+                value=1,
+                ex=revoked_tokens[token_id],
+            )
+        pipeline.publish(
+            REVOKED_TOKENS_CHANNEL,
+            json.dumps({"token_ids": token_ids, "published_at": time.time()}),
+        )
+        return await pipeline.execute()
+
+
+@timed_redis
+async def scan_revoked_token_ids():
+    prefix = revoked_token_key(token_id="")
+    return [
+        key.removeprefix(prefix)
+        async for key in gr_redis.scan_iter(match=f"{prefix}*", count=1000)
+    ]
+
+
+def revoked_tokens_pubsub():
+    return gr_redis.pubsub(ignore_subscribe_messages=True)
+
+
+@timed_redis
+async def get_revoked_token(token_id: str):
+    key = revoked_token_key(token_id=token_id)
+    return await gr_redis.get(name=key)
+
+
+def admin_profile_key(admin_uid: str):
+    return f"admin-profile-{admin_uid}"
+
+
+def admin_email_key(email: str):
+    return f"admin-email-{email}"
+
+
+@timed_redis
+async def get_admin_profile(admin_uid: str):
+    key = admin_profile_key(admin_uid=admin_uid)
+    return await gr_redis.get(name=key)
+
+
+@timed_redis
+async def get_admin_uid_by_email(email: str):
+    key = admin_email_key(email=email)
+    return await gr_redis.get(name=key)
+
+
+@timed_redis
+async def add_admin_profile(admin_uid: str, email: str, profile: str):
+    # the email key only points at the admin_uid, so invalidating by admin_uid
+    # also covers lookups under an email the admin has since changed
+    async with gr_redis.pipeline(transaction=False) as pipeline:
+        pipeline.set(
+            name=admin_profile_key(admin_uid=admin_uid),
+            value=profile,
+            ex=ADMIN_PROFILE_EXPIRE,
+        )
+        pipeline.set(
+            name=admin_email_key(email=email), value=admin_uid, ex=ADMIN_PROFILE_EXPIRE
+        )
+        return await pipeline.execute()
+
+
+@timed_redis
+async def invalidate_admin_profile(admin_uid: str):
+    """Drop the shared copy and tell every worker to drop its local one."""
+    async with gr_redis.pipeline(transaction=False) as pipeline:
+        pipeline.delete(admin_profile_key(admin_uid=admin_uid))
+        pipeline.publish(ADMIN_PROFILE_CHANNEL, admin_uid)
+        return await pipeline.execute()
+
+
+def admin_profile_pubsub():
+    return gr_redis.pubsub(ignore_subscribe_messages=True)
+
+
+def dashboard_statistics_key(installation: str):
+    return f"dashboard-statistics-{installation}"
+
+
+@timed_redis
+async def get_dashboard_statistics(installation: str):
+    key = dashboard_statistics_key(installation=installation)
+
+    return await gr_redis.hgetall(name=key)
+
+
+@timed_redis
+async def add_dashboard_statistics(installation: str, statistics: dict):
+    key = dashboard_statistics_key(installation=installation)
+
+    # MULTI/EXEC so the hash never exists without its TTL
+    async with gr_redis.pipeline() as pipeline:
+        pipeline.hset(name=key, mapping=statistics)
+        pipeline.expire(name=key, time=DASHBOARD_STATISTICS_EXPIRE)
+        return await pipeline.execute()
+
+
+# only bump entries that are cached; a missing field would read as a partial hash
+_increment_dashboard_statistics = gr_redis.register_script(
+    """
+    for _, key in ipairs(KEYS) do
+        if redis.call("EXISTS", key) == 1 then
+            for i = 1, #ARGV, 2 do
+                redis.call("HINCRBY", key, ARGV[i], ARGV[i + 1])
+            end
+        end
+    end
+    """
+)
+
+
+@timed_redis
+async def increment_dashboard_statistics(installations: list[str], deltas: dict):
+    keys = [
+        dashboard_statistics_key(installation=installation)
+        for installation in installations
+    ]
+    args = [item for field, delta in deltas.items() for item in (field, delta)]
+
+    return await _increment_dashboard_statistics(keys=keys, args=args)
+
+
+@timed_redis
+async def delete_dashboard_statistics(installations: list[str]):
+    keys = [
+        dashboard_statistics_key(installation=installation)
+        for installation in installations
+    ]
+    return await gr_redis.delete(*keys)
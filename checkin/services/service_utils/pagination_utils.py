@@ -0,0 +1,26 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+from uuid import UUID
+
+
+CURSOR_SEPARATOR = "|"
+
+
+def encode_cursor(date_created_utc: datetime, member_uid: UUID) -> str:
+    raw_cursor = f"{date_created_utc.isoformat()}{CURSOR_SEPARATOR}{member_uid}"
+    return urlsafe_b64encode(raw_cursor.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Turn an opaque next_cursor back into its (date_created_utc, member_uid) keyset.
+
+    Raises:
+        ValueError: the cursor was not produced by encode_cursor
+    """
+    try:
+        raw_cursor = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_created_utc, member_uid = raw_cursor.split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(date_created_utc), UUID(member_uid)
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise ValueError(f"invalid cursor: {cursor}")
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+from redis import RedisError
+
+import checkin.services.service_utils.gr_redis_utils as redis_utils
+from checkin.root.settings import Settings
+from checkin.root.utils.bloom_filter import BloomFilter
+
+LOGGER = logging.getLogger(__name__)
+
+settings = Settings()
+
+# Per-process Bloom filter of revoked token ids. A miss means "not revoked"
+# without a Redis round trip; only hits are confirmed against Redis. Until the
+# filter is loaded (or after the pub/sub feed drops) every check goes to Redis.
+revoked_token_filter = BloomFilter(
+    capacity=settings.revocation_filter_capacity,
+    error_rate=settings.revocation_filter_error_rate,
+)
+REVOCATION_FILTER_STATS = {
+    "ready": False,
+    "checks": 0,
+    "filter_hits": 0,
+    "false_positives": 0,
+    "entries": 0,
+    "rebuilds": 0,
+    "sync_lag_seconds_last": 0.0,
+    "sync_lag_seconds_max": 0.0,
+}
+
+_ids_during_rebuild: Optional[set[str]] = None
+_tasks: list[asyncio.Task] = []
+
+
+def might_be_revoked(token_id: str) -> bool:
+    REVOCATION_FILTER_STATS["checks"] += 1
+    if not REVOCATION_FILTER_STATS["ready"] or token_id in revoked_token_filter:
+        REVOCATION_FILTER_STATS["filter_hits"] += 1
+        return True
+    return False
+
+
+def record_false_positive():
+    if REVOCATION_FILTER_STATS["ready"]:
+        REVOCATION_FILTER_STATS["false_positives"] += 1
+
+
+def false_positive_rate() -> float:
+    hits = REVOCATION_FILTER_STATS["filter_hits"]
+    return REVOCATION_FILTER_STATS["false_positives"] / hits if hits else 0.0
+
+
+def revocation_filter_statistics():
+    return {**REVOCATION_FILTER_STATS, "false_positive_rate": false_positive_rate()}
+
+
+def add_revoked_token_ids(token_ids: list[str]):
+    for token_id in token_ids:
+        revoked_token_filter.add(token_id)
+        if _ids_during_rebuild is not None:
+            _ids_during_rebuild.add(token_id)
+    REVOCATION_FILTER_STATS["entries"] = revoked_token_filter.count
+
+
+async def rebuild():
+    """Reload the filter from Redis, dropping ids whose revocation has expired."""
+    global revoked_token_filter, _ids_during_rebuild
+
+    _ids_during_rebuild = set()
+    try:
+        token_ids = await redis_utils.scan_revoked_token_ids()
+        rebuilt_filter = BloomFilter(
+            capacity=max(settings.revocation_filter_capacity, 2 * len(token_ids)),
+            error_rate=settings.revocation_filter_error_rate,
+        )
+        # ids published while scanning may have been missed by the scan
+        for token_id in [*token_ids, *_ids_during_rebuild]:
+            rebuilt_filter.add(token_id)
+        revoked_token_filter = rebuilt_filter
+    finally:
+        _ids_during_rebuild = None
+
+    # `ready` is left to the subscriber: a rebuild while the feed is down would
+    # otherwise trust a filter that misses every later revocation
+    REVOCATION_FILTER_STATS.update(
+        entries=revoked_token_filter.count,
+        rebuilds=REVOCATION_FILTER_STATS["rebuilds"] + 1,
+    )
+
+
+def _apply_revocation_message(data: str):
+    message = json.loads(data)
+    add_revoked_token_ids(token_ids=message["token_ids"])
+
+    sync_lag = max(0.0, time.time() - message["published_at"])
+    REVOCATION_FILTER_STATS["sync_lag_seconds_last"] = sync_lag
+    REVOCATION_FILTER_STATS["sync_lag_seconds_max"] = max(
+        REVOCATION_FILTER_STATS["sync_lag_seconds_max"], sync_lag
+    )
+
+
+async def _follow_revocations():
+    try:
+        while True:
+            pubsub = redis_utils.revoked_tokens_pubsub()
+            try:
+                # subscribe before loading so nothing revoked in between is missed
+                await pubsub.subscribe(redis_utils.REVOKED_TOKENS_CHANNEL)
+                await rebuild()
+                REVOCATION_FILTER_STATS["ready"] = True
+                async for message in pubsub.listen():
+                    # one bad payload must not stop the feed while `ready` stays set
+                    try:
+                        _apply_revocation_message(data=message["data"])
+                    except (ValueError, KeyError, TypeError) as e:
+                        LOGGER.exception(e)
+                        LOGGER.error(
+                            f"malformed revocation message: {message['data']!r}"
+                        )
+            except (RedisError, OSError) as e:
+                REVOCATION_FILTER_STATS["ready"] = False
+                LOGGER.exception(e)
+                LOGGER.error("revoked token feed lost, checking Redis until resynced")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+    finally:
+        REVOCATION_FILTER_STATS["ready"] = False
+
+
+async def _rebuild_periodically():
+    while True:
+        await asyncio.sleep(settings.revocation_filter_rebuild_seconds)
+        try:
+            await rebuild()
+        except RedisError as e:
+            LOGGER.exception(e)
+            LOGGER.error("revoked token filter rebuild failed")
+
+
+async def start():
+    _tasks.extend(
+        [
+            asyncio.create_task(_follow_revocations()),
+            asyncio.create_task(_rebuild_periodically()),
+        ]
+    )
+
+
+async def stop():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -0,0 +1,33 @@
+"""member listing keyset index
+
+Revision ID: 3c9a1f2e8b41
+Revises: 7b6f3cd047d4
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9a1f2e8b41"
+down_revision: Union[str, None] = "7b6f3cd047d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_members_installation_date_created_utc_member_uid",
+        "members",
+        ["installation", "date_created_utc", "member_uid"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_members_installation_date_created_utc_member_uid", table_name="members"
+    )
@@ -0,0 +1,43 @@
+"""member name trigram indexes
+
+Revision ID: a41d7c2e9f03
+Revises: 3c9a1f2e8b41
+Create Date: 2026-10-18 10:04:52.118734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a41d7c2e9f03"
+down_revision: Union[str, None] = "3c9a1f2e8b41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # icontains compiles to column ILIKE ..., which a trigram index on the plain
+    # column serves; pg_trgm matches case-insensitively on its own
+    op.execute(
+        "CREATE INDEX ix_members_first_name_trgm ON members "
+        "USING gin (first_name gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_members_last_name_trgm ON members "
+        "USING gin (last_name gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_members_full_name_trgm ON members USING gin "
+        "(lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '')) "
+        "gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_members_full_name_trgm", table_name="members")
+    op.drop_index("ix_members_last_name_trgm", table_name="members")
+    op.drop_index("ix_members_first_name_trgm", table_name="members")
@@ -0,0 +1,42 @@
+"""attendance daily uniqueness
+
+Revision ID: c8e25b0d7a16
+Revises: a41d7c2e9f03
+Create Date: 2026-10-18 11:21:07.530964
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e25b0d7a16"
+down_revision: Union[str, None] = "a41d7c2e9f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep the earliest record of any duplicate check-ins before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM attendance a
+        USING attendance b
+        WHERE a.member_uid = b.member_uid
+          AND a.date = b.date
+          AND coalesce(a.guest_installation, '') = coalesce(b.guest_installation, '')
+          AND (a.date_created_utc, a.uid) > (b.date_created_utc, b.uid)
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX uq_attendance_member_uid_date_guest_installation "
+        "ON attendance (member_uid, date, coalesce(guest_installation, ''))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "uq_attendance_member_uid_date_guest_installation", table_name="attendance"
+    )
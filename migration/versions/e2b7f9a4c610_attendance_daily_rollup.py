@@ -0,0 +1,40 @@
+"""attendance daily rollup
+
+Revision ID: e2b7f9a4c610
+Revises: c8e25b0d7a16
+Create Date: 2026-10-18 12:47:19.884520
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7f9a4c610"
+down_revision: Union[str, None] = "c8e25b0d7a16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # history is loaded with bin/backfill_attendance_rollup.py
+    op.create_table(
+        "attendance_daily_rollup",
+        sa.Column("installation", sa.String(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("sunday_service", sa.Integer(), nullable=False),
+        sa.Column("midweek_service", sa.Integer(), nullable=False),
+        sa.Column("global_gethsemane", sa.Integer(), nullable=False),
+        sa.Column("first_timers", sa.Integer(), nullable=False),
+        sa.Column("guests", sa.Integer(), nullable=False),
+        sa.Column("date_created_utc", sa.DateTime(), nullable=True),
+        sa.Column("date_updated_utc", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("installation", "date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("attendance_daily_rollup")
@@ -0,0 +1,47 @@
+"""attendance first time flag
+
+Revision ID: f3a8c1d6e272
+Revises: e2b7f9a4c610
+Create Date: 2026-10-18 16:05:42.118307
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a8c1d6e272"
+down_revision: Union[str, None] = "e2b7f9a4c610"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "attendance",
+        sa.Column(
+            "is_first_time",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    # the status at check-in time was never stored; existing rows take the
+    # member's current flag. Rebuild the rollup afterwards with
+    # bin/backfill_attendance_rollup.py so it counts from this column.
+    op.execute(
+        """
+        UPDATE attendance a
+        SET is_first_time = m.is_first_time
+        FROM members m
+        WHERE m.member_uid = a.member_uid
+        """
+    )
+    op.alter_column("attendance", "is_first_time", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("attendance", "is_first_time")
@@ -1,33 +1,97 @@
-from groundible_client.root.app import settings
-from groundible_client.root.app import app
-from pytest_postgresql import factories
-from uuid import uuid4
+from checkin.root.app import app
+from checkin.root.utils.abstract_base import AbstractBase
+from checkin.schemas.member_schemas import Attendance, Installation, NewMember
+from checkin.schemas.commons_schemas import IslandTribe
+from datetime import date
 from fakeredis.aioredis import FakeRedis
 from fastapi.testclient import TestClient
+from pytest_postgresql.janitor import DatabaseJanitor
+from sqlalchemy import URL, text
+from uuid import uuid4
+import checkin.database.db_handlers.member_db_handler as member_db_handler
+import checkin.root.database as database
+import checkin.services.service_utils.gr_redis_utils as redis_utils
 import pytest
+import pytest_asyncio
+
+TEST_DBNAME = "checkin_test"
 
 
 @pytest.fixture(scope="session")
-async def mock_redis():
+def postgres_url(postgresql_proc):
+    # postgresql_proc starts a throwaway server from pg_ctl (see --postgresql-exec)
+    with DatabaseJanitor(
+        user=postgresql_proc.user,
+        host=postgresql_proc.host,
+        port=postgresql_proc.port,
+        dbname=TEST_DBNAME,
+        version=postgresql_proc.version,
+        password=postgresql_proc.password,
+    ):
+        yield URL.create(
+            "postgresql+asyncpg",
+            username=postgresql_proc.user,
+            password=postgresql_proc.password,
+            host=postgresql_proc.host,
+            port=postgresql_proc.port,
+            database=TEST_DBNAME,
+        ).render_as_string(hide_password=False)
+
+
+@pytest.fixture
+def mock_redis(monkeypatch):
     fake_redis = FakeRedis(decode_responses=True)
-    yield fake_redis
-    # Clean up the FakeRedis instance after the test
-    fake_redis.connection_pool.disconnect()
+    monkeypatch.setattr(redis_utils, "gr_redis", fake_redis)
+    return fake_redis
 
 
-@pytest.fixture(scope="session")
-async def mock_postgres():
-    postgresql = factories.postgresql(process_fixture_name=str(uuid4()))
-    yield postgresql
+@pytest_asyncio.fixture
+async def database_engine(postgres_url, mock_redis):
+    """A fresh schema per test; session_scope and get_session are rebound to it."""
+    engine = database.build_engine(url=postgres_url)
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.run_sync(AbstractBase.metadata.create_all)
 
+    database.async_session.configure(bind=engine)
+    yield engine
 
-@pytest.fixture(scope="session")
-async def app_test_client_fixture(mock_postgres, mock_redis):
-    redis_url = mock_redis.url
-    postgres_url = mock_postgres.dsn()
+    database.async_session.configure(bind=database.engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(AbstractBase.metadata.drop_all)
+    await engine.dispose()
 
-    settings.postgres_url = postgres_url
-    settings.redis_url = redis_url
 
+@pytest_asyncio.fixture
+async def app_test_client_fixture(database_engine):
     with TestClient(app=app) as test_client:
         yield test_client
+
+
+async def seed_members(count: int, with_attendance: bool = False):
+    members = []
+    for _ in range(count):
+        suffix = uuid4().hex[:8]
+        member = await member_db_handler.create_new_member(
+            new_member=NewMember(
+                first_name=f"first-{suffix}",
+                last_name=f"last-{suffix}",
+                email=f"{suffix}@gr.com",
+                phone_number="08000000000",
+                tribe=IslandTribe.lekki,
+            ),
+            installation=Installation.island,
+        )
+        if with_attendance:
+            await member_db_handler.create_attendance_record(
+                attendance=Attendance(
+                    member_uid=member.member_uid,
+                    date=date.today(),
+                    sunday_service=True,
+                    global_gethsemane=False,
+                    midweek_service=False,
+                    is_guest=False,
+                )
+            )
+        members.append(member)
+    return members
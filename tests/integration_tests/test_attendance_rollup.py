@@ -0,0 +1,77 @@
+from checkin.database.orms.member_orm import AttendanceDailyRollup as RollupDB
+from checkin.root.database import async_session
+from checkin.schemas.member_schemas import (
+    Attendance,
+    Installation,
+    MemberUpdate,
+    NewMember,
+)
+from checkin.schemas.commons_schemas import IslandTribe
+from datetime import date, timedelta
+from sqlalchemy import select
+from uuid import uuid4
+import checkin.database.db_handlers.member_db_handler as member_db_handler
+import pytest
+
+
+async def _rollup_rows():
+    async with async_session() as session:
+        rows = (await session.execute(select(RollupDB))).scalars().all()
+        return {
+            (row.installation, row.date): tuple(
+                getattr(row, counter) for counter in member_db_handler.ROLLUP_COUNTERS
+            )
+            for row in rows
+            # a day whose attendance was all removed keeps a row of zeros
+            if any(
+                getattr(row, counter) for counter in member_db_handler.ROLLUP_COUNTERS
+            )
+        }
+
+
+def _attendance(member_uid, date_: date) -> Attendance:
+    return Attendance(
+        member_uid=member_uid,
+        date=date_,
+        sunday_service=True,
+        global_gethsemane=False,
+        midweek_service=False,
+        is_guest=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_incremental_rollup_matches_rebuild_after_status_change(
+    database_engine,
+):
+    suffix = uuid4().hex[:8]
+    member = await member_db_handler.create_new_member(
+        new_member=NewMember(
+            first_name=f"first-{suffix}",
+            last_name=f"last-{suffix}",
+            email=f"{suffix}@gr.com",
+            phone_number="08000000000",
+            tribe=IslandTribe.lekki,
+        ),
+        installation=Installation.island,
+    )
+    today = date.today()
+    first_visit = await member_db_handler.create_attendance_record(
+        attendance=_attendance(member.member_uid, today - timedelta(days=7))
+    )
+
+    # the member stops being a first-timer between the two visits
+    await member_db_handler.update_member(
+        member_uid=member.member_uid,
+        member_update=MemberUpdate(is_first_time=False),
+    )
+    await member_db_handler.create_attendance_record(
+        attendance=_attendance(member.member_uid, today)
+    )
+    await member_db_handler.delete_attendance_record(uid=first_visit.uid)
+
+    incremental = await _rollup_rows()
+    await member_db_handler.rebuild_attendance_rollup()
+
+    assert incremental == await _rollup_rows()
+    assert incremental[(Installation.island.value, today)][3] == 0
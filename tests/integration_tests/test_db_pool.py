@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+import checkin.root.database as database
+import pytest
+import time
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_require_an_admin(app_test_client_fixture: TestClient):
+    result = app_test_client_fixture.get("/db-pool/stats")
+    assert result.status_code in (401, 403)
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_excludes_opening_connections(postgres_url):
+    engine = database.build_engine(url=postgres_url)
+    wait_seconds_total = database.DB_POOL_STATS["wait_seconds_total"]
+    try:
+        start = time.perf_counter()
+        # an empty pool: the checkout opens a connection without queueing
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        checkout = time.perf_counter() - start
+    finally:
+        await engine.dispose()
+
+    waited = database.DB_POOL_STATS["wait_seconds_total"] - wait_seconds_total
+    assert waited < checkout / 10
@@ -0,0 +1,77 @@
+from checkin.schemas.member_schemas import Installation
+from sqlalchemy import event
+from tests.conftest import seed_members
+import checkin.database.db_handlers.member_db_handler as member_db_handler
+import checkin.services.service_utils.pagination_utils as pagination_utils
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_installation_members_statement_count(database_engine):
+    await seed_members(count=5, with_attendance=True)
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database_engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        members = await member_db_handler.get_installation_members(
+            installation=Installation.island.value
+        )
+    finally:
+        event.remove(database_engine.sync_engine, "before_cursor_execute", _count)
+
+    assert len(members.result_set) >= 5
+    assert all(member.attendance for member in members.result_set)
+    # members page, total count, and one batched attendance query
+    assert len(statements) == 3
+
+
+@pytest.mark.asyncio
+async def test_installation_members_cursor_pagination(database_engine):
+    await seed_members(count=5, with_attendance=True)
+
+    first_page = await member_db_handler.get_installation_members(
+        installation=Installation.island.value, limit=2
+    )
+    assert len(first_page.result_set) == 2
+    assert first_page.next_cursor is not None
+
+    second_page = await member_db_handler.get_installation_members(
+        installation=Installation.island.value,
+        limit=2,
+        cursor=pagination_utils.decode_cursor(cursor=first_page.next_cursor),
+    )
+    first_uids = {member.member_uid for member in first_page.result_set}
+    assert len(second_page.result_set) == 2
+    assert not first_uids & {member.member_uid for member in second_page.result_set}
+
+
+@pytest.mark.asyncio
+async def test_installation_members_smallest_page(database_engine):
+    await seed_members(count=2, with_attendance=True)
+
+    page = await member_db_handler.get_installation_members(
+        installation=Installation.island.value, limit=1
+    )
+    assert len(page.result_set) == 1
+    assert page.next_cursor is not None
+
+
+@pytest.mark.asyncio
+async def test_segment_members_are_keyset_paged(database_engine):
+    members = await seed_members(count=5)
+
+    batches = []
+    async for batch in member_db_handler.stream_segment_members(
+        installation=Installation.island.value, batch_size=2
+    ):
+        # nothing is held open while the campaign works through a batch
+        assert database_engine.sync_engine.pool.checkedout() == 0
+        batches.append(batch)
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    streamed = [member["member_uid"] for batch in batches for member in batch]
+    assert streamed == sorted(member.member_uid for member in members)
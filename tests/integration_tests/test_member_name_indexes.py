@@ -0,0 +1,58 @@
+from checkin.schemas.member_schemas import Installation
+from sqlalchemy import event, text
+from tests.conftest import seed_members
+import checkin.database.db_handlers.member_db_handler as member_db_handler
+import pytest
+
+
+async def _plan(engine, lookup) -> str:
+    """EXPLAIN the statement `lookup` issues, with sequential scans priced out."""
+    executed = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        await lookup()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+
+    statement, parameters = executed[0]
+    async with engine.connect() as connection:
+        # a handful of rows is cheaper to scan; only ask whether an index applies
+        await connection.execute(text("SET enable_seqscan = off"))
+        result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.asyncio
+async def test_name_lookup_uses_trigram_indexes(database_engine):
+    member, *_ = await seed_members(count=20)
+
+    plan = await _plan(
+        database_engine,
+        lambda: member_db_handler.get_member_via_names(
+            first_name=member.first_name.upper(), last_name=member.last_name.upper()
+        ),
+    )
+
+    # ~~* is ILIKE
+    assert "~~*" in plan
+    assert "Seq Scan" not in plan
+    assert "ix_members_first_name_trgm" in plan or "ix_members_last_name_trgm" in plan
+
+
+@pytest.mark.asyncio
+async def test_member_search_uses_full_name_trigram_index(database_engine):
+    await seed_members(count=20)
+
+    plan = await _plan(
+        database_engine,
+        lambda: member_db_handler.search_members(
+            query="first last", installation=Installation.global_.value
+        ),
+    )
+
+    assert "Seq Scan" not in plan
+    assert "ix_members_full_name_trgm" in plan
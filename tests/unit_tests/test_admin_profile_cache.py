@@ -0,0 +1,69 @@
+from checkin.schemas.auth_schemas import AdminType, AdminUserProfile
+from checkin.schemas.commons_schemas import Installation
+from fakeredis.aioredis import FakeRedis
+from uuid import uuid4
+import asyncio
+import checkin.services.service_utils.admin_profile_cache as admin_profile_cache
+import checkin.services.service_utils.gr_redis_utils as redis_utils
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_password_hash_is_not_cached(monkeypatch):
+    fake_redis = FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_utils, "gr_redis", fake_redis)
+    admin_profile = AdminUserProfile(
+        admin_uid=uuid4(),
+        email="admin@gr.com",
+        password="$2b$12$hash",
+        first_name="first",
+        last_name="last",
+        phone_number="08000000000",
+        installation=Installation.ibadan,
+        admin_type=AdminType.installation,
+    )
+
+    await admin_profile_cache.cache_admin_profile(admin_profile=admin_profile)
+
+    cached = await fake_redis.get(
+        redis_utils.admin_profile_key(admin_uid=str(admin_profile.admin_uid))
+    )
+    assert "$2b$12$hash" not in cached
+    cached_profile = await admin_profile_cache.get_admin_profile_by_email(
+        email="admin@gr.com"
+    )
+    assert cached_profile.admin_uid == admin_profile.admin_uid
+    assert cached_profile.password is None
+
+
+async def _wait_until(predicate):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_malformed_invalidation_keeps_the_feed_alive(monkeypatch):
+    fake_redis = FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_utils, "gr_redis", fake_redis)
+    forgotten = []
+    monkeypatch.setattr(
+        admin_profile_cache, "_forget", lambda admin_uid: forgotten.append(admin_uid)
+    )
+
+    task = asyncio.create_task(admin_profile_cache._follow_invalidations())
+    await _wait_until(lambda: admin_profile_cache.ADMIN_CACHE_STATS["ready"])
+
+    admin_uid = uuid4()
+    await fake_redis.publish(redis_utils.ADMIN_PROFILE_CHANNEL, "not-a-uuid")
+    await fake_redis.publish(redis_utils.ADMIN_PROFILE_CHANNEL, str(admin_uid))
+    await _wait_until(lambda: forgotten)
+
+    assert forgotten == [admin_uid]
+    assert admin_profile_cache.ADMIN_CACHE_STATS["ready"]
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert not admin_profile_cache.ADMIN_CACHE_STATS["ready"]
@@ -0,0 +1,44 @@
+from checkin.root.utils.rate_limiter import RateLimiter
+from checkin.schemas.campaign_schemas import MailCampaignProgress, MemberSegment
+from checkin.schemas.commons_schemas import Installation
+from datetime import datetime
+from email.message import EmailMessage
+from uuid import uuid4
+import checkin.services.campaign_service as campaign_service
+import asyncio
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_unexpected_delivery_error_counts_as_failed(monkeypatch):
+    async def deliver(smtp, message):
+        if message["To"] == "broken@gr.com":
+            raise UnicodeEncodeError("ascii", "", 0, 1, "unencodable header")
+        return smtp, True
+
+    monkeypatch.setattr(campaign_service.mail_queue, "deliver", deliver)
+    progress = MailCampaignProgress(
+        campaign_uid=uuid4(),
+        admin_uid=uuid4(),
+        subject="Sunday",
+        segment=MemberSegment(installation=Installation.ibadan),
+        started_at=datetime.utcnow(),
+    )
+    outbox = asyncio.Queue()
+    for recipient in ("broken@gr.com", "member@gr.com"):
+        message = EmailMessage()
+        message["To"] = recipient
+        outbox.put_nowait(message)
+
+    sender = asyncio.create_task(
+        campaign_service._send(
+            progress=progress, outbox=outbox, limiter=RateLimiter(rate=1000)
+        )
+    )
+    await asyncio.wait_for(outbox.join(), timeout=2)
+
+    assert not sender.done()
+    assert (progress.sent, progress.failed) == (1, 1)
+
+    sender.cancel()
+    await asyncio.gather(sender, return_exceptions=True)
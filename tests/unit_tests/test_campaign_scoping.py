@@ -0,0 +1,90 @@
+from checkin.schemas.auth_schemas import AdminType, AdminUserProfile
+from checkin.schemas.campaign_schemas import (
+    MailCampaign,
+    MailCampaignProgress,
+    MemberSegment,
+)
+from checkin.schemas.commons_schemas import Installation
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from uuid import uuid4
+import checkin.services.campaign_service as campaign_service
+import pytest
+
+
+def _admin(installation: Installation) -> AdminUserProfile:
+    return AdminUserProfile(
+        admin_uid=uuid4(),
+        email="admin@gr.com",
+        password="hashed",
+        first_name="first",
+        last_name="last",
+        phone_number="08000000000",
+        installation=installation,
+        admin_type=AdminType.installation,
+    )
+
+
+@pytest.mark.asyncio
+async def test_campaign_cannot_target_another_installation():
+    campaign = MailCampaign(
+        subject="Sunday",
+        template="user_auth/token_email_template.html",
+        segment=MemberSegment(installation=Installation.global_),
+    )
+
+    with pytest.raises(HTTPException) as error:
+        await campaign_service.start_campaign(
+            campaign=campaign, admin_profile=_admin(Installation.ibadan)
+        )
+    assert error.value.status_code == 403
+
+
+def test_campaigns_are_visible_to_their_owner_and_global_admins(monkeypatch):
+    owner, other = _admin(Installation.ibadan), _admin(Installation.ibadan)
+    progress = MailCampaignProgress(
+        campaign_uid=uuid4(),
+        admin_uid=owner.admin_uid,
+        subject="Sunday",
+        segment=MemberSegment(installation=Installation.ibadan),
+        started_at=datetime.utcnow(),
+    )
+    monkeypatch.setitem(campaign_service.campaigns, progress.campaign_uid, progress)
+
+    assert campaign_service.list_campaigns(admin_profile=other) == []
+    with pytest.raises(HTTPException) as error:
+        campaign_service.get_campaign(
+            campaign_uid=progress.campaign_uid, admin_profile=other
+        )
+    assert error.value.status_code == 404
+
+    for admin in (owner, _admin(Installation.global_)):
+        assert campaign_service.list_campaigns(admin_profile=admin) == [progress]
+
+
+def test_finished_campaigns_are_evicted_after_retention(monkeypatch):
+    admin = _admin(Installation.ibadan)
+    now = datetime.utcnow()
+    retention = timedelta(seconds=campaign_service.settings.campaign_retention_seconds)
+
+    def _progress(finished_at):
+        progress = MailCampaignProgress(
+            campaign_uid=uuid4(),
+            admin_uid=admin.admin_uid,
+            subject="Sunday",
+            segment=MemberSegment(installation=Installation.ibadan),
+            started_at=now - 2 * retention,
+            finished_at=finished_at,
+        )
+        monkeypatch.setitem(campaign_service.campaigns, progress.campaign_uid, progress)
+        return progress
+
+    running = _progress(finished_at=None)
+    recent = _progress(finished_at=now - retention / 2)
+    expired = _progress(finished_at=now - retention * 1.5)
+
+    listed = campaign_service.list_campaigns(admin_profile=admin)
+
+    assert running in listed and recent in listed
+    assert expired not in listed
+    assert expired.campaign_uid not in campaign_service.campaigns
@@ -0,0 +1,136 @@
+import checkin.root.utils.mail_queue as mail_queue
+from aiosmtpd.controller import Controller
+import asyncio
+import socket
+import pytest
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    def __init__(self, transient_failures: int = 0):
+        self.transient_failures = transient_failures
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.transient_failures:
+            self.transient_failures -= 1
+            return "451 try again later"
+
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    def serve(handler: RecordingHandler):
+        controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        servers.append(controller)
+
+        monkeypatch.setattr(mail_queue.settings, "mail_server", "127.0.0.1")
+        monkeypatch.setattr(mail_queue.settings, "mail_port", controller.port)
+        monkeypatch.setattr(mail_queue.settings, "mail_starttls", False)
+        monkeypatch.setattr(mail_queue.settings, "mail_use_credentials", False)
+        monkeypatch.setattr(mail_queue.settings, "mail_retry_backoff_seconds", 0.01)
+        return handler
+
+    servers = []
+    yield serve
+    for controller in servers:
+        controller.stop()
+
+
+@pytest.mark.asyncio
+async def test_queued_mail_is_delivered_over_one_session(smtp_server):
+    handler = smtp_server(RecordingHandler())
+    await mail_queue.start()
+    connections_opened = mail_queue.MAIL_QUEUE_STATS["connections_opened"]
+
+    for token in range(5):
+        mail_queue.enqueue_mail(
+            subject="Forgot Password",
+            reciepients=["admin@example.com"],
+            payload={"token": 1000 + token},
+            template="user_auth/token_email_template.html",
+        )
+    await mail_queue.stop()
+
+    assert len(handler.messages) == 5
+    assert handler.messages[0].rcpt_tos == ["admin@example.com"]
+    assert b"1000" in handler.messages[0].content
+    # workers keep their session open between messages
+    assert (
+        mail_queue.MAIL_QUEUE_STATS["connections_opened"] - connections_opened
+        <= mail_queue.settings.mail_smtp_connections
+    )
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(smtp_server):
+    handler = smtp_server(RecordingHandler(transient_failures=2))
+    await mail_queue.start()
+    retried = mail_queue.MAIL_QUEUE_STATS["retried"]
+
+    mail_queue.enqueue_mail(
+        subject="Forgot Password",
+        reciepients=["admin@example.com"],
+        payload={"token": 1234},
+        template="user_auth/token_email_template.html",
+    )
+    await mail_queue.stop()
+
+    assert len(handler.messages) == 1
+    assert mail_queue.MAIL_QUEUE_STATS["retried"] - retried == 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_mail(smtp_server, monkeypatch):
+    smtp_server(RecordingHandler())
+    monkeypatch.setattr(mail_queue.settings, "mail_queue_max_size", 1)
+    monkeypatch.setattr(mail_queue.settings, "mail_smtp_connections", 0)
+    await mail_queue.start()
+
+    message = mail_queue.render_mail(
+        subject="Forgot Password",
+        reciepients=["admin@example.com"],
+        payload={"token": 1234},
+        template="user_auth/token_email_template.html",
+    )
+    mail_queue.enqueue_message(message=message)
+    with pytest.raises(asyncio.QueueFull):
+        mail_queue.enqueue_message(message=message)
+
+    await mail_queue.stop(timeout=0)
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_does_not_stop_the_worker(smtp_server, monkeypatch):
+    handler = smtp_server(RecordingHandler())
+    monkeypatch.setattr(mail_queue.settings, "mail_smtp_connections", 1)
+    await mail_queue.start()
+    failed = mail_queue.MAIL_QUEUE_STATS["failed"]
+
+    broken = mail_queue.render_mail(
+        subject="Forgot Password",
+        reciepients=["admin@example.com"],
+        payload={"token": 1234},
+        template="user_auth/token_email_template.html",
+    )
+    # aiosmtplib raises ValueError for a message without any recipient
+    del broken["To"]
+    mail_queue.enqueue_message(message=broken)
+    mail_queue.enqueue_mail(
+        subject="Forgot Password",
+        reciepients=["admin@example.com"],
+        payload={"token": 1235},
+        template="user_auth/token_email_template.html",
+    )
+    await mail_queue.stop()
+
+    assert len(handler.messages) == 1
+    assert mail_queue.MAIL_QUEUE_STATS["failed"] - failed == 1
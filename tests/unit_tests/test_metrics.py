@@ -0,0 +1,73 @@
+from checkin.root.utils.prometheus import Histogram, Registry
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.util import greenlet_spawn
+from uuid import UUID
+import checkin.root.metrics as metrics
+import pytest
+
+
+def test_histogram_exposition():
+    registry = Registry()
+    histogram = registry.register(
+        Histogram(
+            "latency_seconds", "Latency.", labelnames=("route",), buckets=(0.1, 1)
+        )
+    )
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.1, route="/a")
+    histogram.observe(3, route="/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 3.15',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_db_handler_name_crosses_sqlalchemy_greenlet():
+    # a handler coroutine awaiting SQLAlchemy, whose cursor events run in a greenlet
+    handler_module = {"__name__": "checkin.database.db_handlers.member_db_handler"}
+    exec(
+        "async def get_member_profile(execute):\n    return await execute()",
+        handler_module,
+    )
+
+    async def execute():
+        return await greenlet_spawn(metrics.db_handler_name)
+
+    assert (
+        await handler_module["get_member_profile"](execute)
+        == "member_db_handler.get_member_profile"
+    )
+    assert await greenlet_spawn(metrics.db_handler_name) == "other"
+
+
+def test_requests_are_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.HTTPMetricsMiddleware)
+
+    @app.get("/v1/members/{member_uid}")
+    async def get_member(member_uid: UUID):
+        return {"member_uid": member_uid}
+
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.get("/v1/members/5b7ff1b0-6d35-4d0b-9b1c-0f8c4cf2e0a1")
+        assert response.status_code == 200
+    assert client.get("/v1/unknown").status_code == 404
+
+    exposition = metrics.render()
+    assert (
+        'http_requests_total{method="GET",route="/v1/members/{member_uid}",status="200"} 2'
+        in exposition
+    )
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in (
+        exposition
+    )
+    assert "5b7ff1b0" not in exposition
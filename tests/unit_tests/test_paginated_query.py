@@ -0,0 +1,11 @@
+from checkin.schemas.commons_schemas import PaginatedQuery
+from pydantic import ValidationError
+import pytest
+
+
+def test_page_limit_must_be_positive():
+    # a zero limit left the handler with an empty page to take a cursor from
+    with pytest.raises(ValidationError):
+        PaginatedQuery(limit=0)
+
+    assert PaginatedQuery(limit=1).limit == 1
@@ -0,0 +1,82 @@
+import checkin.services.service_utils.auth_utils as auth_utils
+import checkin.root.metrics as metrics
+import asyncio
+import time
+import pytest
+
+
+async def _checkin_latencies(stop: asyncio.Event) -> list[float]:
+    # stands in for check-in requests sharing the event loop with logins
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        latencies.append(time.perf_counter() - start - 0.005)
+    return latencies
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_round_trip():
+    hashed_password = await auth_utils.hash_password(plain_password="pa55word")
+
+    assert await auth_utils.verify_password(
+        plain_password="pa55word", hashed_password=hashed_password
+    )
+    assert not await auth_utils.verify_password(
+        plain_password="wrong", hashed_password=hashed_password
+    )
+
+
+@pytest.mark.asyncio
+async def test_checkin_latency_during_login_burst():
+    hashed_password = await auth_utils.hash_password(plain_password="pa55word")
+
+    stop = asyncio.Event()
+    checkins = asyncio.create_task(_checkin_latencies(stop=stop))
+    await asyncio.gather(
+        *(
+            auth_utils.verify_password(
+                plain_password="pa55word", hashed_password=hashed_password
+            )
+            for _ in range(8)
+        )
+    )
+    stop.set()
+    latencies = await checkins
+
+    # eight inline bcrypt verifies would stall the loop for well over a second
+    assert max(latencies) < 0.1
+    assert auth_utils.PASSWORD_HASH_STATS["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_rehashes_to_configured_cost():
+    cheap_hash = auth_utils.pwd_context.hash("pa55word", rounds=4)
+
+    verified, rehashed_password = await auth_utils.verify_and_update_password(
+        plain_password="pa55word", hashed_password=cheap_hash
+    )
+
+    assert verified
+    assert rehashed_password.startswith(f"$2b${auth_utils.settings.bcrypt_rounds:02d}$")
+    assert await auth_utils.verify_and_update_password(
+        plain_password="pa55word", hashed_password=rehashed_password
+    ) == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_counted_and_exported():
+    stats = dict(auth_utils.PASSWORD_HASH_STATS)
+
+    with pytest.raises(ValueError):
+        await auth_utils.verify_password(
+            plain_password="pa55word", hashed_password="not-a-hash"
+        )
+
+    assert auth_utils.PASSWORD_HASH_STATS["failed"] == stats["failed"] + 1
+    assert auth_utils.PASSWORD_HASH_STATS["completed"] == stats["completed"]
+
+    exposition = metrics.render()
+    assert 'password_hash_jobs_total{outcome="failed"}' in exposition
+    assert "password_hash_queue_wait_seconds_count" in exposition
+    assert "password_hash_jobs_in_flight 0" in exposition
@@ -0,0 +1,49 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import checkin.root.query_profiler as query_profiler
+import logging
+import pytest
+
+
+def test_statements_normalize_to_one_shape():
+    assert query_profiler.normalize_statement(
+        "SELECT members.uid FROM members\n  WHERE members.uid IN ($1, $2, $3)"
+    ) == query_profiler.normalize_statement(
+        "SELECT members.uid FROM members WHERE members.uid IN ($1)"
+    )
+    assert (
+        query_profiler.normalize_statement(
+            "SELECT * FROM t2 WHERE name = 'it''s' LIMIT 10"
+        )
+        == "SELECT * FROM t2 WHERE name = ? LIMIT ?"
+    )
+
+
+def test_repeated_statement_is_reported(caplog, monkeypatch):
+    monkeypatch.setattr(query_profiler.settings, "query_profiler_max_repeats", 3)
+    app = FastAPI()
+    app.add_middleware(query_profiler.QueryProfilerMiddleware)
+
+    @app.get("/v1/attendances/")
+    async def get_members():
+        # one attendance lookup per listed member
+        for index in range(5):
+            query_profiler.record_statement(
+                statement=f"SELECT * FROM attendance WHERE member_uid = ${index + 1}",
+                duration=0.002,
+            )
+        return []
+
+    with caplog.at_level(logging.WARNING, logger=query_profiler.LOGGER.name):
+        headers = TestClient(app).get("/v1/attendances/").headers
+
+    assert headers["x-db-queries"] == "5"
+    assert headers["x-db-time-ms"] == "10.00"
+    assert "5x SELECT * FROM attendance WHERE member_uid = ?" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_statements_outside_a_request_are_ignored(caplog):
+    query_profiler.record_statement(statement="SELECT 1", duration=0.001)
+
+    assert caplog.records == []
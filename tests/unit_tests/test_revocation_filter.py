@@ -0,0 +1,39 @@
+from fakeredis.aioredis import FakeRedis
+import checkin.services.service_utils.gr_redis_utils as redis_utils
+import checkin.services.service_utils.revocation_filter as revocation_filter
+import asyncio
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_feed_survives_a_malformed_message(monkeypatch):
+    fake_redis = FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_utils, "gr_redis", fake_redis)
+    await revocation_filter.start()
+    try:
+        while not revocation_filter.REVOCATION_FILTER_STATS["ready"]:
+            await asyncio.sleep(0.01)
+
+        await fake_redis.publish(redis_utils.REVOKED_TOKENS_CHANNEL, "not json")
+        await fake_redis.publish(redis_utils.REVOKED_TOKENS_CHANNEL, '{"token_ids": 1}')
+        await redis_utils.add_revoked_tokens(revoked_tokens={"revoked-jti": 60})
+
+        for _ in range(100):
+            if "revoked-jti" in revocation_filter.revoked_token_filter:
+                break
+            await asyncio.sleep(0.01)
+        assert revocation_filter.might_be_revoked(token_id="revoked-jti")
+    finally:
+        await revocation_filter.stop()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_does_not_mark_the_filter_ready(monkeypatch):
+    monkeypatch.setattr(redis_utils, "gr_redis", FakeRedis(decode_responses=True))
+    monkeypatch.setitem(revocation_filter.REVOCATION_FILTER_STATS, "ready", False)
+
+    # the periodic rebuild while the feed is down
+    await revocation_filter.rebuild()
+
+    assert not revocation_filter.REVOCATION_FILTER_STATS["ready"]
+    assert revocation_filter.might_be_revoked(token_id="unknown-jti")
@@ -0,0 +1,64 @@
+from checkin.schemas.auth_schemas import AdminType, AdminUserProfile
+from checkin.schemas.commons_schemas import Installation
+from fakeredis.aioredis import FakeRedis
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from uuid import uuid4
+import checkin.services.service_utils.auth_utils as auth_utils
+import checkin.services.service_utils.gr_redis_utils as redis_utils
+import checkin.services.service_utils.revocation_filter as revocation_filter
+import pytest
+import time
+
+
+@pytest.mark.asyncio
+async def test_cached_token_revoked_on_another_worker_is_rejected(monkeypatch):
+    monkeypatch.setattr(redis_utils, "gr_redis", FakeRedis(decode_responses=True))
+    monkeypatch.setitem(revocation_filter.REVOCATION_FILTER_STATS, "ready", True)
+    admin_profile = AdminUserProfile(
+        admin_uid=uuid4(),
+        email="admin@gr.com",
+        first_name="first",
+        last_name="last",
+        phone_number="08000000000",
+        installation=Installation.ibadan,
+        admin_type=AdminType.installation,
+    )
+    access_token = auth_utils.create_access_token(
+        data={"admin_uid": str(admin_profile.admin_uid)}
+    )
+    token = await auth_utils.verify_access_token(token=access_token)
+    auth_utils.cache_verified_token(
+        token=access_token,
+        admin_profile=admin_profile,
+        exp=token.exp,
+        revoked_token_id=token.token_id,
+    )
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=access_token
+    )
+    assert await auth_utils.get_current_user(auth_credential=credentials) == (
+        admin_profile
+    )
+
+    # what the revocation feed does on this worker after a logout elsewhere
+    await redis_utils.add_revoked_tokens(revoked_tokens={token.token_id: 60})
+    revocation_filter.add_revoked_token_ids(token_ids=[token.token_id])
+
+    with pytest.raises(HTTPException) as error:
+        await auth_utils.get_current_user(auth_credential=credentials)
+    assert error.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_token_expiry_is_capped_by_the_signer_max_age(monkeypatch):
+    monkeypatch.setattr(redis_utils, "gr_redis", FakeRedis(decode_responses=True))
+    access_token = auth_utils.create_jwt_access_token(data={"admin_uid": str(uuid4())})
+    signed_at = time.time()
+
+    token = await auth_utils.verify_access_token(token=access_token)
+
+    # the JWT exp is ACCESS_TOKEN_EXPIRE_MINUTES minutes out, but the signer stops
+    # accepting the token after the same number of seconds
+    max_age = auth_utils.ACCESS_TOKEN_EXPIRE_MINUTES
+    assert signed_at + max_age - 2 <= token.exp <= signed_at + max_age